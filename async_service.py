@@ -0,0 +1,194 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: asyncio front-end that serves graph queries from a thread pool, coalescing same-source requests
+
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ServiceOverloaded(Exception):
+    """
+    Raised by AsyncGraphService when a query arrives while max_pending queries are already admitted
+    """
+
+
+class AsyncGraphService:
+    """
+    asyncio front-end for a DirectedGraph or UndirectedGraph
+    - queries run in a thread pool against graph.snapshot(), taken in the pool too (publishing a new version
+      compacts the graph, O(V + E)), so neither blocks the event loop and a traversal never races a writer that
+      mutates the graph inside graph.batch()
+    - concurrent queries share one traversal: every bfs(s, e) in flight for the same snapshot waits on one BFS from s
+      that stops at e (likewise dfs and shortest_path(s, e, max_distance))
+    - is_valid_path() calls made in the same event-loop iteration are checked together in one validate_paths() call
+    - at most max_concurrency traversals run at once and at most max_pending are admitted (running or queued);
+      beyond that new queries fail fast with ServiceOverloaded, so the queue (and tail latency) stays bounded
+    """
+
+    def __init__(self, graph, max_concurrency=4, max_pending=1000, executor=None):
+        """
+        Wrap graph. Pass an executor to share a thread pool between services; otherwise the service owns one with
+        max_concurrency threads, shut down by close().
+        """
+        self.graph = graph
+        self.max_pending = max_pending
+        self.coalesced = 0  # queries answered by a traversal started for another query
+        self.rejected = 0  # queries refused with ServiceOverloaded
+        self._executor = executor or ThreadPoolExecutor(max_concurrency, thread_name_prefix='graph-query')
+        self._owns_executor = executor is None
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending = 0  # admitted traversals, running or waiting for a slot
+        self._inflight = dict()  # (snapshot method, snapshot, arguments) -> task running that traversal
+        self._paths = None  # (path, future) pairs waiting for the next is_valid_path batch
+        self._snapshotting = None  # (task, started flag) of the snapshot() call queued in the pool, if any
+
+    async def __aenter__(self) -> 'AsyncGraphService':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shuts down the thread pool if the service created it
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    def _admit(self) -> None:
+        """
+        Reserves a pending slot for a new query, or raises ServiceOverloaded if all are taken
+        """
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceOverloaded(f'{self._pending} graph queries already pending')
+        self._pending += 1
+
+    async def _call(self, fn, *args):
+        """
+        Runs fn(*args) in the thread pool once one of the max_concurrency slots is free
+        """
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _run(self, fn, *args):
+        """
+        Runs fn(*args) like _call() for a query admitted with _admit(), and releases its pending slot afterwards
+        """
+        try:
+            return await self._call(fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def _snapshot(self):
+        """
+        Returns graph.snapshot(), called in the thread pool since publishing a new version compacts the graph.
+        Queries arriving while the call is still queued share it; once it has started, the next query queues a new
+        one, so no query is answered from a snapshot taken before it arrived.
+        """
+        queued = self._snapshotting
+        if queued is None or queued[1][0]:
+            started = [False]
+
+            def take():
+                started[0] = True
+                return self.graph.snapshot()
+
+            task = asyncio.ensure_future(asyncio.get_running_loop().run_in_executor(self._executor, take))
+            queued = self._snapshotting = (task, started)
+
+            def done(_):
+                if self._snapshotting is queued:
+                    self._snapshotting = None
+
+            task.add_done_callback(done)
+        return await asyncio.shield(queued[0])
+
+    async def _shared(self, method: str, *args):
+        """
+        Returns snapshot.<method>(*args) for the latest published snapshot, joining the traversal already in
+        flight for the same method, snapshot and arguments if there is one
+        """
+        snap = await self._snapshot()
+        key = (method, snap, args)  # the snapshot taken in the pool identifies the version queried
+        task = self._inflight.get(key)
+        if task is None:
+            self._admit()  # only a new traversal takes a pending slot
+            task = asyncio.ensure_future(self._run(getattr(snap, method), *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)  # a cancelled caller must not cancel the other callers' traversal
+
+    async def dfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during DFS search (see the graph's dfs())
+        """
+        order = await self._shared('dfs', v_start, v_end)
+        return order[:]  # the list is shared between coalesced callers
+
+    async def bfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during BFS search (see the graph's bfs())
+        """
+        order = await self._shared('bfs', v_start, v_end)
+        return order[:]
+
+    async def dijkstra(self, src):
+        """
+        Shortest distances from src, in the format of the graph snapshot's dijkstra()
+        """
+        dist = await self._shared('dijkstra', src)
+        return dist.copy()
+
+    async def shortest_path(self, src, dst, max_distance=None) -> (float, []):
+        """
+        Returns (distance, path) for the shortest path from src to dst, or (INFINITY, []) if dst is unreachable or
+        farther than max_distance. Concurrent queries for the same src, dst and max_distance share one search.
+        """
+        distance, path = await self._shared('shortest_path', src, dst, max_distance)
+        return distance, path[:]
+
+    async def is_valid_path(self, path: []) -> bool:
+        """
+        Return True if path is a valid path in the graph (see the graph's is_valid_path())
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._paths is None:  # first path of a new batch - flush it once the loop has gathered the others
+            self._paths = []
+            loop.call_soon(self._flush_paths)
+        self._paths.append((list(path), future))
+        return await future
+
+    def _flush_paths(self) -> None:
+        """
+        Starts validating every path gathered since the last flush as one batch
+        """
+        batch, self._paths = self._paths, None
+        asyncio.ensure_future(self._validate(batch))
+
+    async def _validate(self, batch: []) -> None:
+        """
+        Checks a batch of (path, future) pairs with one validate_paths() call and resolves the futures
+        """
+        try:
+            self._admit()
+            valid = await self._run(self._validate_paths, [path for path, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), ok in zip(batch, valid):
+            if not future.done():  # the caller may have been cancelled
+                future.set_result(bool(ok))
+
+    def _validate_paths(self, paths: []):
+        """
+        Runs in the thread pool: validates paths against the latest published snapshot
+        """
+        return self.graph.snapshot().validate_paths(paths)
@@ -0,0 +1,373 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Reproducible benchmark harness for DirectedGraph and UndirectedGraph
+#
+#   python bench.py run --tiers 1e3 1e4 --out base.json      time every operation on seeded synthetic graphs
+#   python bench.py compare base.json new.json              list operations that got slower (exit code 1 if any)
+
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from itertools import accumulate
+
+from d_graph import DirectedGraph
+from ud_graph import UndirectedGraph
+
+TIERS = {'1e3': 10 ** 3, '1e4': 10 ** 4, '1e5': 10 ** 5, '1e6': 10 ** 6, '1e7': 10 ** 7}  # edges per graph
+SAMPLES = 8  # traversal sources, paths and vertex pairs drawn per graph
+MUTATIONS = 1000  # edits applied by each mutation benchmark
+
+
+# ------------------------------------------------------------------ #
+# seeded graph generators - each returns (v_count, [(src, dst, weight)]) with no self-loops
+
+def erdos_renyi(n: int, m: int, rng: random.Random) -> (int, []):
+    """
+    G(n, m): m edges between uniformly random vertex pairs
+    """
+    edges = []
+    while len(edges) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            edges.append((u, v, rng.randint(1, 20)))
+    return n, edges
+
+
+def power_law(n: int, m: int, rng: random.Random, exponent=2.5) -> (int, []):
+    """
+    Chung-Lu graph whose expected degrees follow a power law with the given exponent (a few hubs, a long tail)
+    """
+    cum_weights = list(accumulate((i + 1) ** (-1 / (exponent - 1)) for i in range(n)))
+    edges = []
+    while len(edges) < m:
+        for u, v in zip(rng.choices(range(n), cum_weights=cum_weights, k=m),
+                        rng.choices(range(n), cum_weights=cum_weights, k=m)):
+            if u != v and len(edges) < m:
+                edges.append((u, v, rng.randint(1, 20)))
+    return n, edges
+
+
+def grid(n: int, m: int, rng: random.Random) -> (int, []):
+    """
+    Road-like sqrt(n) x sqrt(n) grid: every cell is linked both ways to its right and lower neighbor
+    """
+    side = max(2, math.isqrt(n))
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            v = r * side + c
+            for u in ((v + 1) if c + 1 < side else None, (v + side) if r + 1 < side else None):
+                if u is not None:
+                    w = rng.randint(1, 20)
+                    edges.append((v, u, w))
+                    edges.append((u, v, w))
+    return side * side, edges
+
+
+def dag(n: int, m: int, rng: random.Random) -> (int, []):
+    """
+    Random DAG: every edge goes from a smaller to a larger id
+    """
+    edges = []
+    while len(edges) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            edges.append((min(u, v), max(u, v), rng.randint(1, 20)))
+    return n, edges
+
+
+WORKLOADS = {  # name -> (generator, average out-degree)
+    'er-sparse': (erdos_renyi, 4),
+    'er-dense': (erdos_renyi, 64),
+    'power-law': (power_law, 8),
+    'grid': (grid, 4),
+    'dag': (dag, 8),
+}
+
+
+def generate(workload: str, edges: int, seed: int) -> (int, []):
+    """
+    Builds the edge list of a workload at one scale. The same (workload, edges, seed) always gives the same graph.
+    """
+    generator, degree = WORKLOADS[workload]
+    rng = random.Random(f'{workload}/{edges}/{seed}')
+    return generator(max(2, edges // degree), edges, rng)
+
+
+# ------------------------------------------------------------------ #
+# benchmarked operations - (name, function(graph, ctx), mutates[, setup(graph, ctx)])
+# mutating operations run on a fresh copy of the graph; setup, if given, prepares that copy outside the timing
+
+class Context:
+    """
+    Inputs shared by the operations on one graph: sampled sources, paths and pairs, mutations and a scratch dir
+    """
+
+    def __init__(self, v_count: int, edges: [], rng: random.Random, tmpdir: str, workers: int, named: bool):
+        name = str if named else int
+        self.edges = edges
+        self.workers = workers
+        self.tmpdir = tmpdir
+        self.sources = [name(rng.randrange(v_count)) for _ in range(SAMPLES)]
+        self.pairs = [(name(rng.randrange(v_count)), name(rng.randrange(v_count))) for _ in range(SAMPLES)]
+        self.paths = [[name(u), name(v)] for u, v, _ in rng.sample(edges, min(len(edges), 100 * SAMPLES))]
+        self.new_edges = [(rng.randrange(v_count), rng.randrange(v_count), rng.randint(1, 20))
+                          for _ in range(MUTATIONS)]
+        self.old_edges = [(name(u), name(v)) for u, v, _ in rng.sample(edges, min(len(edges), MUTATIONS))]
+        self.vertices = [name(rng.randrange(v_count)) for _ in range(MUTATIONS // 10)]
+
+    def path(self, file_name: str) -> str:
+        return os.path.join(self.tmpdir, file_name)
+
+
+def _drain(iterator) -> None:
+    deque(iterator, maxlen=0)
+
+
+def _index_reachability(graph, context) -> None:
+    graph.reachable(0, 0)  # builds the reachability index
+
+
+DIRECTED_OPS = [
+    ('get_vertices', lambda g, c: g.get_vertices(), False),
+    ('get_edges', lambda g, c: g.get_edges(), False),
+    ('iter_edges', lambda g, c: _drain(g.iter_edges()), False),
+    ('iter_edges_by_dst', lambda g, c: _drain(g.iter_edges(order='dst')), False),
+    ('edge_arrays', lambda g, c: g.edge_arrays(), False),
+    ('is_valid_path', lambda g, c: [g.is_valid_path(p) for p in c.paths], False),
+    ('validate_paths', lambda g, c: g.validate_paths(c.paths), False),
+    ('dfs', lambda g, c: [g.dfs(s) for s in c.sources], False),
+    ('bfs', lambda g, c: [g.bfs(s) for s in c.sources], False),
+    ('bfs_tree', lambda g, c: g.bfs_tree(c.sources[0], c.workers), False),
+    ('hop_distances', lambda g, c: [g.hop_distances(s) for s in c.sources], False),
+    ('reachable_within', lambda g, c: [g.reachable_within(s, 3) for s in c.sources], False),
+    ('out_degrees', lambda g, c: g.out_degrees(), False),
+    ('in_degrees', lambda g, c: g.in_degrees(), False),
+    ('has_cycle', lambda g, c: g.has_cycle(), False),
+    ('find_cycle', lambda g, c: g.find_cycle(), False),
+    ('topological_order', lambda g, c: g.topological_order(), False),
+    ('dijkstra', lambda g, c: [g.dijkstra(s) for s in c.sources], False),
+    ('dijkstra_many', lambda g, c: g.dijkstra_many(c.sources, c.workers), False),
+    ('shortest_path', lambda g, c: [g.shortest_path(s, t) for s, t in c.pairs], False),
+    ('shortest_path_bidirectional', lambda g, c: [g.shortest_path(s, t, bidirectional=True) for s, t in c.pairs],
+     False),
+    ('build_landmarks', lambda g, c: g.build_landmarks(), True),
+    ('astar', lambda g, c: [g.astar(s, t) for s, t in c.pairs], True, lambda g, c: g.build_landmarks()),
+    ('snapshot_dijkstra', lambda g, c: [g.snapshot().dijkstra(s) for s in c.sources], False),
+    ('save', lambda g, c: g.save(c.path('graph.bin')), False),
+    ('load', lambda g, c: DirectedGraph.load(c.path('graph.bin')).dfs(0), False),
+    ('write_edge_list', lambda g, c: g.write_edge_list(c.path('edges.tsv')), False),
+    ('read_edge_list', lambda g, c: DirectedGraph.read_edge_list(c.path('edges.tsv')), False),
+    ('add_vertex', lambda g, c: [g.add_vertex() for _ in range(MUTATIONS)], True),
+    ('add_edge', lambda g, c: [g.add_edge(u, v, w) for u, v, w in c.new_edges], True),
+    ('remove_edge', lambda g, c: [g.remove_edge(u, v) for u, v in c.old_edges], True),
+    ('add_edges_from', lambda g, c: g.add_edges_from(c.new_edges), True),
+    ('compact', lambda g, c: g.compact(), True),
+    ('cached_dijkstra', lambda g, c: (g.cache_shortest_paths(),
+                                      [g.dijkstra(s) for s in c.sources * 4]), True),
+    ('track_shortest_paths', lambda g, c: (g.track_shortest_paths(c.sources[:2]),
+                                           [g.add_edge(u, v, w) for u, v, w in c.new_edges]), True),
+    ('reachable', lambda g, c: [g.reachable(s, t) for s, t in c.pairs * 100], True, _index_reachability),
+    ('reachable_many', lambda g, c: g.reachable_many(c.pairs * 100), True, _index_reachability),
+    ('reachable_after_remove_edge', lambda g, c: (g.remove_edge(*c.old_edges[0]),
+                                                  g.reachable_many(c.pairs * 100)), True, _index_reachability),
+]
+
+UNDIRECTED_OPS = [
+    ('get_vertices', lambda g, c: g.get_vertices(), False),
+    ('get_edges', lambda g, c: g.get_edges(), False),
+    ('iter_edges', lambda g, c: _drain(g.iter_edges()), False),
+    ('iter_edges_sorted', lambda g, c: _drain(g.iter_edges(order='sorted')), False),
+    ('edge_arrays', lambda g, c: g.edge_arrays(), False),
+    ('is_valid_path', lambda g, c: [g.is_valid_path(p) for p in c.paths], False),
+    ('validate_paths', lambda g, c: g.validate_paths(c.paths), False),
+    ('dfs', lambda g, c: [g.dfs(s) for s in c.sources], False),
+    ('bfs', lambda g, c: [g.bfs(s) for s in c.sources], False),
+    ('bfs_tree', lambda g, c: g.bfs_tree(c.sources[0], c.workers), False),
+    ('connected_components', lambda g, c: g.connected_components(), False),
+    ('count_connected_components', lambda g, c: g.count_connected_components(), False),
+    ('has_cycle', lambda g, c: g.has_cycle(), False),
+    ('snapshot_bfs', lambda g, c: [g.snapshot().bfs(s) for s in c.sources], False),
+    ('save', lambda g, c: g.save(c.path('graph.bin')), False),
+    ('load', lambda g, c: UndirectedGraph.load(c.path('graph.bin')).get_vertices(), False),
+    ('write_edge_list', lambda g, c: g.write_edge_list(c.path('edges.tsv')), False),
+    ('read_edge_list', lambda g, c: UndirectedGraph.read_edge_list(c.path('edges.tsv')), False),
+    ('add_vertex', lambda g, c: [g.add_vertex(f'new{i}') for i in range(MUTATIONS)], True),
+    ('add_edge', lambda g, c: [g.add_edge(str(u), str(v)) for u, v, _ in c.new_edges], True),
+    ('remove_edge', lambda g, c: [g.remove_edge(u, v) for u, v in c.old_edges], True),
+    ('remove_vertex', lambda g, c: [g.remove_vertex(v) for v in c.vertices], True),
+    ('remove_vertices', lambda g, c: g.remove_vertices(c.vertices), True),
+    ('add_edges_from', lambda g, c: g.add_edges_from((str(u), str(v)) for u, v, _ in c.new_edges), True),
+    ('compact', lambda g, c: g.compact(), True),
+    ('connected', lambda g, c: (g.track_connectivity(),
+                                [g.connected(s, t) for s, t in c.pairs * 100]), True),
+]
+
+CLASSES = {
+    'directed': (DirectedGraph, DIRECTED_OPS,
+                 lambda edges: DirectedGraph.from_edges(edges)),
+    'undirected': (UndirectedGraph, UNDIRECTED_OPS,
+                   lambda edges: UndirectedGraph.from_edges((str(u), str(v)) for u, v, _ in edges)),
+}
+
+
+# ------------------------------------------------------------------ #
+# measurement
+
+def _measure_memory(fn) -> int:
+    """
+    Runs fn() once under tracemalloc and returns the peak number of bytes it allocated on top of what was live
+    """
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def _time(fn, repeat: int) -> []:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_graph(kind: str, workload: str, tier: str, seed: int, repeat: int, workers: int, memory: bool,
+                only=None) -> []:
+    """
+    Builds one seeded graph and times every operation of its class on it. Read-only operations run repeat times
+    on the same graph; mutations run once each on a freshly built copy, after their setup (untimed). Returns one
+    result dict per operation.
+    """
+    cls, ops, build = CLASSES[kind]
+    v_count, edges = generate(workload, TIERS[tier], seed)
+    key = {'class': cls.__name__, 'workload': workload, 'tier': tier, 'vertices': v_count, 'edges': len(edges)}
+    results = []
+
+    def record(op: str, times: [], peak):
+        results.append(dict(key, op=op, repeat=len(times), min=min(times), median=statistics.median(times),
+                            peak_bytes=peak))
+        print(f"{cls.__name__:16} {workload:10} {tier:4} {op:28} {statistics.median(times):10.4f}s"
+              + ('' if peak is None else f' {peak / 2 ** 20:9.1f} MiB'), file=sys.stderr)
+
+    record('build', _time(lambda: build(edges), repeat), _measure_memory(lambda: build(edges)) if memory else None)
+    graph = build(edges)
+
+    with tempfile.TemporaryDirectory(prefix='graph-bench-') as tmpdir:
+        context = Context(v_count, edges, random.Random(seed), tmpdir, workers, kind == 'undirected')
+        for op, fn, mutates, *setup in ops:
+            if only and op not in only:
+                continue
+            if mutates:
+                times, peak = [], None
+                for _ in range(repeat):
+                    fresh = build(edges)
+                    for prepare in setup:
+                        prepare(fresh, context)
+                    times.extend(_time(lambda: fn(fresh, context), 1))
+                if memory:
+                    fresh = build(edges)
+                    for prepare in setup:
+                        prepare(fresh, context)
+                    peak = _measure_memory(lambda: fn(fresh, context))
+            else:
+                times = _time(lambda: fn(graph, context), repeat)
+                peak = _measure_memory(lambda: fn(graph, context)) if memory else None
+            record(op, times, peak)
+    return results
+
+
+def run(args) -> int:
+    results = []
+    for tier in args.tiers:
+        for workload in args.workloads:
+            for kind in args.classes:
+                results.extend(bench_graph(kind, workload, tier, args.seed, args.repeat, args.workers,
+                                           not args.no_memory, set(args.ops or ())))
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+                 'seed': args.seed, 'repeat': args.repeat, 'workers': args.workers},
+        'results': sorted(results, key=lambda r: (r['class'], r['workload'], TIERS[r['tier']], r['op'])),
+    }
+    text = json.dumps(report, indent=1, sort_keys=True)  # stable layout, so two runs diff line by line
+    if args.out:
+        with open(args.out, 'w') as out:
+            out.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+def compare(args) -> int:
+    """
+    Compares two result files operation by operation and lists every operation whose median time (or peak memory)
+    grew by more than the threshold factor. Returns 1 if there is any regression.
+    """
+    def load(path):
+        with open(path) as f:
+            return {(r['class'], r['workload'], r['tier'], r['op']): r for r in json.load(f)['results']}
+
+    old, new = load(args.old), load(args.new)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys(), key=lambda k: (k[0], k[1], TIERS[k[2]], k[3])):
+        before, after = old[key], new[key]
+        changes = []
+        if after['median'] > args.min_seconds and after['median'] > before['median'] * args.threshold:
+            changes.append(f"time {before['median']:.4f}s -> {after['median']:.4f}s "
+                           f"(x{after['median'] / max(before['median'], 1e-9):.2f})")
+        if before['peak_bytes'] and after['peak_bytes'] and after['peak_bytes'] > before['peak_bytes'] * args.threshold:
+            changes.append(f"peak {before['peak_bytes'] / 2 ** 20:.1f} -> {after['peak_bytes'] / 2 ** 20:.1f} MiB")
+        if changes:
+            regressions += 1
+            print(' '.join(key), '|', '; '.join(changes))
+    for key in sorted(old.keys() - new.keys()):
+        print(' '.join(key), '| missing from', args.new)
+    print(f'{regressions} regression(s) over x{args.threshold}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='benchmark the graph classes')
+    run_parser.add_argument('--tiers', nargs='+', choices=TIERS, default=['1e3', '1e4'])
+    run_parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    run_parser.add_argument('--classes', nargs='+', choices=CLASSES, default=list(CLASSES))
+    run_parser.add_argument('--ops', nargs='+', help='only run these operations (plus build)')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--workers', type=int, default=1, help='processes for bfs_tree and dijkstra_many')
+    run_parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory pass')
+    run_parser.add_argument('--out', help='write the JSON report here instead of stdout')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='list regressions between two JSON reports')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=1.2, help='slowdown factor to report')
+    compare_parser.add_argument('--min-seconds', type=float, default=1e-3, help='ignore operations faster than this')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Union-find (disjoint sets) for incremental connectivity tracking
+
+
+class DisjointSets:
+    """
+    Union-find over arbitrary hashable elements
+    - union by size and path halving, so find() and union() are near O(1) amortized
+    - count is the current number of disjoint sets
+    - elements cannot be removed; callers rebuild instead
+    """
+
+    def __init__(self):
+        self._parent = dict()
+        self._size = dict()
+        self.count = 0
+
+    def __contains__(self, x) -> bool:
+        return x in self._parent
+
+    def add(self, x) -> None:
+        """
+        Adds x as a singleton set. Does nothing if x is already present.
+        """
+        if x not in self._parent:
+            self._parent[x] = x
+            self._size[x] = 1
+            self.count += 1
+
+    def find(self, x):
+        """
+        Returns the representative of the set containing x
+        """
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return x
+
+    def union(self, a, b) -> bool:
+        """
+        Merges the sets containing a and b. Returns False if they were already in the same set.
+        """
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self._size[a] < self._size[b]:  # attach the smaller tree under the larger one
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        self.count -= 1
+        return True
+
+    def connected(self, a, b) -> bool:
+        """
+        Returns True if a and b are in the same set
+        """
+        return self.find(a) == self.find(b)
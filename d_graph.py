@@ -4,7 +4,21 @@
 # Description: Part 2 - Directed Graph (via Adjacency Matrix)
 
 
-import heapq as heap
+from array import array
+from contextlib import contextmanager
+from threading import RLock
+
+from dynamic_sssp import DynamicShortestPaths
+from graph_io import edge_rows, load_csr, read_edge_list, save_csr, write_edge_list
+from graph_storage import MatrixView, SparseStorage, pack_paths
+from instrumentation import traversal_stats
+from landmarks import LandmarkIndex
+from parallel import iter_dijkstra_many, parallel_bfs
+from path_cache import ShortestPathCache
+from reachability import ReachabilityIndex
+from snapshot import GraphSnapshot
+from shortest_paths import INFINITY, astar_search, bidirectional_search, build_path, dijkstra_search
+from traversal import color_dfs, iter_bfs, iter_dfs
 
 
 class DirectedGraph:
@@ -14,8 +28,12 @@ class DirectedGraph:
     - loops not allowed
     - only positive edge weights
     - vertex names are integers
+    - edges are held by a pluggable storage backend (sparse adjacency dicts + CSR by default, or a NumPy
+      matrix with DenseStorage); adj_matrix is a read-only dense view of it
     """
 
+    storage = SparseStorage  # default backend class for new graphs
+
     def __init__(self, start_edges=None):
         """
         Store graph info as adjacency matrix
@@ -54,16 +72,266 @@ class DirectedGraph:
 
     # ------------------------------------------------------------------ #
 
+    @property
+    def adj_matrix(self) -> MatrixView:
+        """
+        Dense, read-only view of the adjacency matrix. Each row is materialized from the storage backend on access.
+        """
+        return MatrixView(self._storage)
+
+    @adj_matrix.setter
+    def adj_matrix(self, matrix: []) -> None:
+        """
+        Replaces the contents of the graph with a dense adjacency matrix (list of rows)
+        """
+        self._storage = self.storage.from_matrix(matrix)
+        self.v_count = len(matrix)
+        self._published = None  # (storage, version, GraphSnapshot) last handed out by snapshot()
+        if not hasattr(self, '_write_lock'):  # first assignment, from __init__
+            self._write_lock = RLock()
+            self._batching = 0  # depth of nested batch() blocks
+            self._observers = []  # notified of every mutation, see add_observer()
+            self._path_cache = None  # ShortestPathCache used by dijkstra(), see cache_shortest_paths()
+            self._landmarks = None  # LandmarkIndex used by astar(), see build_landmarks()
+            self._reachability = None  # ReachabilityIndex used by reachable(), built on first use
+        else:
+            self._replaced()
+
+    @property
+    def version(self) -> int:
+        """
+        Mutation counter of the graph: bumped by every add_vertex(), add_edge() or remove_edge() that changes the graph
+        """
+        return self._storage.version
+
+    def use_storage(self, backend) -> None:
+        """
+        Moves the graph into a different storage backend class, e.g. use_storage(DenseStorage) for the NumPy
+        dense-matrix mode on dense graphs, or back to SparseStorage
+        """
+        self._storage = backend.from_csr(self._storage.csr())
+        self._replaced()  # the new backend starts its own version count
+
+    def add_observer(self, observer) -> None:
+        """
+        Registers an object to be told about every mutation, right after it is applied:
+        - observer.edge_changed(graph, src, dst, old_weight, new_weight) when an edge is added (old_weight 0),
+          removed (new_weight 0) or reweighted
+        - observer.vertex_added(graph) after add_vertex()
+        - observer.graph_replaced(graph) after bulk changes (add_edges_from(), assigning adj_matrix, use_storage())
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer) -> None:
+        """
+        Unregisters an observer added with add_observer()
+        """
+        self._observers.remove(observer)
+
+    def _replaced(self) -> None:
+        for observer in self._observers:
+            observer.graph_replaced(self)
+
+    def cache_shortest_paths(self, max_entries=128, max_bytes=None) -> ShortestPathCache:
+        """
+        Turns on an LRU cache of dijkstra() results for up to max_entries sources (and max_bytes bytes, if given)
+        and returns it, e.g. to read its hit/miss/eviction counters. Entries survive mutations that cannot change
+        their distances (see ShortestPathCache). cache_shortest_paths(0) turns caching off.
+        """
+        if self._path_cache is not None:
+            self.remove_observer(self._path_cache)
+            self._path_cache = None
+        if max_entries > 0:
+            self._path_cache = ShortestPathCache(max_entries, max_bytes)
+            self.add_observer(self._path_cache)
+        return self._path_cache
+
+    def track_shortest_paths(self, sources=()) -> DynamicShortestPaths:
+        """
+        Returns a DynamicShortestPaths that keeps the shortest-path trees of the given sources up to date as edges
+        are added, removed or reweighted, repairing only the affected part of each tree. Call its close() to stop.
+        """
+        return DynamicShortestPaths(self, sources)
+
+    def build_landmarks(self, k=16, landmarks=None, seed=0) -> LandmarkIndex:
+        """
+        Precomputes a landmark index for astar(): forward and backward Dijkstra sweeps from k landmark vertices
+        (picked farthest-first from a seeded random start, unless the landmarks are given). Costs 2k full searches
+        and 16 * k * V bytes. The index follows the graph's mutations; after an edit that can change its distances
+        it goes stale until rebuild_landmarks(). Returns the index, e.g. to save() it alongside the graph.
+        """
+        storage = self._storage
+        return self.attach_landmarks(LandmarkIndex.build(storage.csr(), storage.reverse_csr(), k, landmarks, seed))
+
+    def rebuild_landmarks(self) -> LandmarkIndex:
+        """
+        Brings a stale landmark index up to date, re-running the 2k sweeps from the same landmarks, e.g. once a
+        round of edits is done. Does nothing if the index is current. Raises ValueError if there is no index.
+        """
+        index = self._landmarks
+        if index is None:
+            raise ValueError('no landmark index - call build_landmarks() first')
+        if index.stale:
+            index.rebuild(self._storage.csr(), self._storage.reverse_csr())
+        return index
+
+    def attach_landmarks(self, index: LandmarkIndex) -> LandmarkIndex:
+        """
+        Makes astar() use index, e.g. one read back with LandmarkIndex.load(). Raises ValueError if the index was
+        not built for a graph of this size.
+        """
+        if index.v_count != self.v_count or index.e_count != self._storage.csr().e_count:
+            raise ValueError(f'landmark index is for {index.v_count} vertices and {index.e_count} edges, '
+                             f'the graph has {self.v_count} and {self._storage.csr().e_count}')
+        if self._landmarks is not None:
+            self.remove_observer(self._landmarks)
+        self._landmarks = index
+        self.add_observer(index)
+        return index
+
+    def compact(self) -> None:
+        """
+        Compacts the graph into its read-optimized form and frees the structures only needed for mutation.
+        The next mutation transparently rebuilds them.
+        """
+        self._storage.compact()
+
+    def _publish(self) -> GraphSnapshot:
+        """
+        Compacts the current version into a GraphSnapshot and makes it the one snapshot() returns
+        """
+        storage = self._storage
+        snap = GraphSnapshot(storage.csr(), storage.version, directed=True)
+        self._published = (storage, storage.version, snap)  # swapped in with a single assignment
+        return snap
+
+    def snapshot(self) -> GraphSnapshot:
+        """
+        Returns an immutable read view of the latest published version of the graph. Any number of reader threads
+        can query it (dfs, bfs, dijkstra, shortest_path) without locks while a writer thread mutates the graph
+        inside batch(); readers never wait for the writer and never see part of a batch.
+        A new version is compacted once (O(V + E)) and then shared by every reader until the next mutation.
+        Mutations from other threads must go through batch().
+        """
+        published = self._published
+        if published is not None and published[0] is self._storage and published[1] == self._storage.version:
+            return published[2]
+        if not self._write_lock.acquire(blocking=published is None):
+            return published[2]  # a batch is being applied - keep serving the last published version
+        try:
+            if self._batching:  # called by the writer mid-batch
+                return published[2] if published is not None else self._publish()
+            return self._publish()
+        finally:
+            self._write_lock.release()
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager for a writer thread applying a group of mutations:
+
+            with graph.batch():
+                graph.remove_edge(0, 1)
+                graph.add_edge(1, 0, 5)
+
+        Holds the writer lock for the whole block and publishes the new version when the outermost batch exits,
+        so snapshot() switches from the old version to the new one in a single step. A batch that raises
+        publishes nothing, but its mutations up to the error stay in the graph.
+        """
+        with self._write_lock:
+            if self._published is None:
+                self._publish()
+            self._batching += 1
+            try:
+                yield self
+            finally:
+                self._batching -= 1
+            if not self._batching:
+                self._publish()
+
+    @classmethod
+    def from_edges(cls, edges=None, *, src=None, dst=None, weight=None) -> 'DirectedGraph':
+        """
+        Builds a graph from (src, dst[, weight]) rows or from src/dst/weight columns in a single O(V + E) pass.
+        Like the constructor, the graph gets one vertex per id up to the largest id in the input. Self-loops and
+        non-positive weights are dropped, and for duplicate edges the last weight wins.
+        """
+        graph = cls()
+        graph.add_edges_from(edges, src=src, dst=dst, weight=weight, grow=True)
+        return graph
+
+    def add_edges_from(self, edges=None, *, src=None, dst=None, weight=None, grow=False) -> None:
+        """
+        Adds many edges at once, following the same rules as add_edge(). Input is either an iterable of
+        (src, dst[, weight]) rows (e.g. a list of tuples or a 2-D NumPy array) or equal-length src/dst/weight
+        columns (lists, arrays, buffers). Edges to vertices that do not exist are skipped unless grow is True,
+        in which case vertices are added up to the largest id seen.
+        """
+        top = self.v_count - 1  # largest vertex id seen so far
+
+        def accepted():
+            nonlocal top
+            for u, v, w in edge_rows(edges, src, dst, weight):
+                if grow:
+                    top = max(top, u, v)
+                elif not (u < self.v_count and v < self.v_count):  # unknown vertex
+                    continue
+                if u >= 0 and v >= 0 and w > 0 and u != v:
+                    yield u, v, w
+
+        self._storage.set_edges(accepted())
+        self.v_count = self._storage.add_vertices(top + 1 - self._storage.v_count)
+        self._replaced()
+
+    @classmethod
+    def read_edge_list(cls, path, delimiter=None, columns=(0, 1, 2), **options) -> 'DirectedGraph':
+        """
+        Builds a graph from a delimited edge-list text file (plain, gzip, bz2, xz or zstd), streaming it in
+        bounded-size chunks. Columns default to src, dst, weight and vertices to int ids; see graph_io.read_edge_list()
+        for the options.
+        """
+        options.setdefault('vertex_type', int)
+        graph = cls()
+        for chunk in read_edge_list(path, delimiter, columns, **options):
+            graph.add_edges_from(chunk, grow=True)
+        return graph
+
+    def write_edge_list(self, path, delimiter='\t', **options) -> int:
+        """
+        Streams the edges to a delimited (optionally compressed) text file as src, dst, weight lines.
+        Returns the number of edges written.
+        """
+        return write_edge_list(path, self.iter_edges(), delimiter, **options)
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to path in the versioned binary CSR format (see graph_io)
+        """
+        save_csr(path, self._storage.csr(), directed=True)
+
+    @classmethod
+    def load(cls, path, mmap=True) -> 'DirectedGraph':
+        """
+        Loads a graph written by save(). With mmap=True the file is memory-mapped rather than read: startup is
+        near-instant, processes loading the same file share its pages, and read-only queries (dfs, bfs, dijkstra,
+        is_valid_path, ...) run straight off the mapped arrays. The first mutation copies the graph into memory.
+        """
+        csr, directed, _ = load_csr(path, mmap)
+        if not directed:
+            raise ValueError(f'{path} does not hold a directed graph')
+        graph = cls()
+        graph._storage = graph.storage.from_csr(csr)
+        graph.v_count = csr.v_count
+        return graph
+
     def add_vertex(self) -> int:
         """
         Adds a new vertex to the graph. Returns an integer number of vertices in the graph after the addition.
         """
         self.v_count += 1  # update vertex count
-
-        for row in self.adj_matrix:  # add new column to existing rows
-            row.append(0)
-
-        self.adj_matrix.append([0]*self.v_count)  # add new row
+        self._storage.add_vertex()  # new vertex starts with no edges - O(1), no column to add
+        for observer in self._observers:
+            observer.vertex_added(self)
 
         return self.v_count
 
@@ -74,7 +342,11 @@ class DirectedGraph:
         exists, the method will update its weight.
         """
         if 0 <= src < self.v_count and 0 <= dst < self.v_count and weight > 0 and src != dst:
-            self.adj_matrix[src][dst] = weight  # set/update weight
+            old = self._storage.weight(src, dst) if self._observers else weight
+            self._storage.set_edge(src, dst, weight)  # set/update weight
+            if old != weight:
+                for observer in self._observers:
+                    observer.edge_changed(self, src, dst, old, weight)
 
     def remove_edge(self, src: int, dst: int) -> None:
         """
@@ -82,7 +354,11 @@ class DirectedGraph:
         between them, the method does nothing.
         """
         if 0 <= src < self.v_count and 0 <= dst < self.v_count:
-            self.adj_matrix[src][dst] = 0
+            old = self._storage.weight(src, dst) if self._observers else 0
+            self._storage.remove_edge(src, dst)
+            if old != 0:
+                for observer in self._observers:
+                    observer.edge_changed(self, src, dst, old, 0)
        
     def get_vertices(self) -> []:
         """
@@ -95,19 +371,31 @@ class DirectedGraph:
 
         return vertices
 
+    def iter_edges(self, order='src'):
+        """
+        Lazily yields the edges as (src, dst, weight) tuples without building a list. O(V + E).
+        order='src' (the get_edges() order) sorts by source then destination; order='dst' sorts by destination
+        then source.
+        """
+        if order == 'src':
+            return self._storage.csr().edges()
+        if order == 'dst':
+            return ((src, dst, weight) for dst, src, weight in self._storage.reverse_csr().edges())
+        raise ValueError(f'unknown edge order {order!r}')
+
+    def edge_arrays(self):
+        """
+        Returns the edges as columnar (src, dst, weight) arrays in get_edges() order, for handing to analytics code
+        without creating a tuple per edge (numpy.frombuffer can wrap them without copying)
+        """
+        return self._storage.csr().edge_columns()
+
     def get_edges(self) -> []:
         """
         Returns a list of edges in the graph. 
         Each edge is returned as a tuple: (source vertex, destination vertex, weight)
         """
-        edges = []
-
-        for src in range(self.v_count):  # source vertices
-            for dst in range(self.v_count):  # destination vertices
-                if self.adj_matrix[src][dst] != 0:  # edge weight
-                    edges.append((src, dst, self.adj_matrix[src][dst]))
-
-        return edges
+        return list(self.iter_edges())  # CSR rows are already ordered by source, then destination - O(V + E)
 
     def is_valid_path(self, path: []) -> bool:
         """
@@ -123,60 +411,64 @@ class DirectedGraph:
             if path[i] < 0 or path[i] >= self.v_count or path[i+1] < 0 or path[i+1] >= self.v_count:
                 return False
             # check edge exists
-            if self.adj_matrix[path[i]][path[i+1]] == 0:
+            if self._storage.weight(path[i], path[i+1]) == 0:
                 return False
         
         return True
 
-    def dfs(self, v_start, v_end=None) -> []:
+    def validate_paths(self, paths, offsets=None, weights=False):
         """
-        Return list of vertices visited during DFS search
-        Vertices are picked in ascending order
+        Batch version of is_valid_path(). paths is either a ragged iterable of paths, or (with offsets) the flat
+        vertex ids of all paths where path p is paths[offsets[p]:offsets[p+1]].
+        Returns a bytearray with 1 for each valid path and 0 otherwise (numpy.frombuffer(..., dtype=bool) wraps it
+        without copying). With weights=True returns (valid, totals), where totals holds each valid path's weight.
         """
-        if v_start not in range(0, self.v_count):  # start vertex not in graph
-            return []
+        if offsets is None:
+            paths, offsets = pack_paths(paths)
+        valid, totals = self._storage.csr().validate_paths(paths, offsets, weights)
+        return (valid, totals) if weights else valid
 
-        visited = []  # stack of visited vertices
-        stack = []  # stack of neighbors to visit
-        stack.append(v_start)
+    def iter_dfs(self, v_start, v_end=None):
+        """
+        Lazily yields the vertices visited during DFS search (see dfs()), so callers can stop early
+        """
+        if v_start not in range(0, self.v_count):  # start vertex not in graph
+            return iter(())
+        stats = traversal_stats('DirectedGraph.dfs')
+        return iter_dfs(v_start, self._storage.csr().neighbors, v_end, self.v_count, stats)
 
-        while len(stack) != 0:
-            src = stack.pop()
-            if src == v_end:  # we have reached the end. add to visited and return
-                visited.append(src)
-                return visited
-            elif src not in visited:  # avoid duplicates
-                visited.append(src)
-                for dst in range(self.v_count-1, -1, -1):  # all vertices in descending order (due to stack nature)
-                    if self.adj_matrix[src][dst] != 0:  # check edge exists
-                        stack.append(dst)
+    def iter_bfs(self, v_start, v_end=None):
+        """
+        Lazily yields the vertices visited during BFS search (see bfs()), so callers can stop early
+        """
+        if v_start not in range(0, self.v_count):
+            return iter(())
+        stats = traversal_stats('DirectedGraph.bfs')
+        return iter_bfs(v_start, self._storage.csr().neighbors, v_end, self.v_count, stats)
 
-        return visited
+    def dfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during DFS search
+        Vertices are picked in ascending order
+        """
+        return list(self.iter_dfs(v_start, v_end))
 
     def bfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during BFS search
         Vertices are picked in ascending order
         """
-        if v_start not in range(0, self.v_count):
-            return []
-        
-        visited = []
-        queue = []
-        queue.append(v_start)
-
-        while len(queue) != 0:
-            src = queue.pop(0)  # pop first element since list is a queue and not a stack
-            if src == v_end:
-                visited.append(src)
-                return visited
-            elif src not in visited:
-                visited.append(src)
-                for dst in range(self.v_count):  # vertices in ascending order (queue)
-                    if self.adj_matrix[src][dst] != 0 and dst not in visited:
-                        queue.append(dst)
-
-        return visited
+        return list(self.iter_bfs(v_start, v_end))
+
+    def bfs_tree(self, v_start: int, workers=None) -> (array, array):
+        """
+        Parallel, direction-optimizing BFS from v_start for very large graphs (see parallel.parallel_bfs()).
+        Returns compact (hops, parents) arrays indexed by vertex: hop counts from v_start and BFS tree parents,
+        -1 where unreachable. The result does not depend on the number of workers (default: one per CPU).
+        """
+        if v_start not in range(0, self.v_count):  # start vertex not in graph
+            return array('q', [-1]) * self.v_count, array('q', [-1]) * self.v_count
+        return parallel_bfs(self._storage.csr(), v_start, workers, self._storage.reverse_csr())
 
     def has_cycle(self):
         """
@@ -185,65 +477,166 @@ class DirectedGraph:
         if 0 <= self.v_count <= 1 :  # 0 or 1 vertices - no cycle
             return False
 
-        white = []  # unvisited list
-        grey = []  # visiting list (if we encounter one of these, there is a cycle)
-        black = []  # visited list (all its neighbors have also been visited)
+        return self.find_cycle() is not None
 
-        for i in range(self.v_count):  # fill unvisited list
-            white.append(i)
+    def find_cycle(self):
+        """
+        Returns a cycle as a list of vertices [v0, v1, ..., vk] (the edge vk -> v0 closes it), or None if the graph
+        is acyclic. Iterative three-color DFS - O(V + E) and safe on arbitrarily long paths.
+        """
+        cycle, _ = color_dfs(self.v_count, self._storage.csr().neighbors, traversal_stats('DirectedGraph.find_cycle'))
+        return cycle
 
-        while len(white) > 0:
-            src = white[0]  # arbitrary starting point for DFS
-            if self.rec_cycle(src, white, grey, black):
-                return True
-        return False
+    def topological_order(self):
+        """
+        Returns the vertices in a topological order (every edge points from an earlier to a later vertex), or None
+        if the graph has a cycle. Uses the same single O(V + E) sweep as find_cycle().
+        """
+        stats = traversal_stats('DirectedGraph.topological_order')
+        cycle, finished = color_dfs(self.v_count, self._storage.csr().neighbors, stats)
+        if cycle is not None:
+            return None
+        finished.reverse()
+        return finished
+
+    def reachable(self, src: int, dst: int) -> bool:
+        """
+        Returns True if there is a path from src to dst (a vertex reaches itself), False otherwise or if either
+        vertex does not exist. Answered from a reachability index (see ReachabilityIndex) that is built on the
+        first call in O(V + E) and then updated in place by add_vertex(), add_edge() and remove_edge(), at a cost
+        proportional to the labels that change. Only an edit that merges or may split a strongly connected
+        component (or a bulk change) makes the next query rebuild it from scratch, at the cost of the first build.
+        Most queries cost O(1).
+        """
+        if src not in range(0, self.v_count) or dst not in range(0, self.v_count):
+            return False
+        return self._reachability_index().reachable(src, dst)
 
-    def rec_cycle(self, src, white, grey, black):
+    def reachable_many(self, pairs) -> []:
         """
-        DFS search helper method for has_cycle. Takes a source vertex - if we have visited but not fully explored one
-        of its neighbors, we found a cycle and the method returns True. If we have not visited a neighbor, method
-        recurses, visiting and exploring that neighbor. If no cycles are found, returns False.
+        Returns [reachable(src, dst) for src, dst in pairs], checking the index once for the whole batch
         """
-        white.remove(src)
-        grey.append(src)
+        index = self._reachability_index()
+        query = index.reachable
+        n = self.v_count
+        return [0 <= src < n and 0 <= dst < n and query(src, dst) for src, dst in pairs]
+
+    def _reachability_index(self) -> ReachabilityIndex:
+        index = self._reachability
+        if index is None:
+            index = self._reachability = ReachabilityIndex.build(self._storage.csr())
+            self.add_observer(index)
+        elif index.stale:
+            index.rebuild(self._storage.csr())
+        return index
+
+    def hop_distances(self, src: int):
+        """
+        Returns the number of edges on a shortest path from src to every vertex (-1 if unreachable), as an int64
+        array.array indexed by vertex (all -1 if src is not in the graph). With DenseStorage each BFS level is a single
+        boolean matrix-vector product.
+        """
+        if src not in range(0, self.v_count):  # start vertex not in graph
+            return array('q', [-1]) * self.v_count
+        return self._storage.hop_distances(src)
 
-        for dst in range(self.v_count):
-            if self.adj_matrix[src][dst] != 0:
-                if dst in black:  # already fully explored
-                    continue
-                if dst in grey:  # found a cycle
-                    return True
-                if self.rec_cycle(dst, white, grey, black):  # must be in white - recurse
-                    return True
+    def reachable_within(self, src: int, k: int) -> []:
+        """
+        Returns the vertices reachable from src in at most k hops (including src), in ascending order, or an empty
+        list if src is not in the graph
+        """
+        if src not in range(0, self.v_count):
+            return []
+        return self._storage.reachable_within(src, k)
 
-        grey.remove(src)  # src has been fully explored (all neighbors explored) - return False
-        black.append(src)
-        return False
+    def out_degrees(self):
+        """
+        Returns the out-degree of every vertex as an int64 array.array indexed by vertex
+        """
+        return self._storage.out_degrees()
 
-    def dijkstra(self, src: int) -> []:
+    def in_degrees(self):
+        """
+        Returns the in-degree of every vertex as an int64 array.array indexed by vertex
+        """
+        return self._storage.in_degrees()
+
+    def dijkstra(self, src: int, max_distance=None) -> []:
         """
         Implements the Dijkstra algorithm to compute the length of the shortest path from a given vertex src to
         all other vertices in the graph. Returns a list with one value per each vertex in the graph, where the value
         at index 0 is the length of the shortest path from vertex src to vertex 0, etc. If a vertex is not reachable
         from src, the respective value in the list is INFINITY. Assumes src is a valid vertex.
+        If max_distance is given, the search stops at that radius and vertices farther away are reported as INFINITY.
+        Full searches are served from the shortest-path cache when one is enabled (see cache_shortest_paths()).
         """
-        min_paths = []  # list of shortest distances to each vertex
-        pq = [(0, src)]  # priority queue - [priority, vertex] where priority is distance
+        cache = self._path_cache if max_distance is None else None
+        if cache is not None:
+            cached = cache.get(src, self.version)
+            if cached is not None:
+                return cached[:]  # callers get their own copy
 
-        for i in range(self.v_count):
-            min_paths.append(float('inf'))  # initialize all min paths as infinity (unreachable)
+        stats = traversal_stats('DirectedGraph.dijkstra')
+        dist, pred = dijkstra_search(self._storage.csr(), src, max_distance=max_distance, stats=stats)
 
-        while len(pq) > 0:
-            d, v = heap.heappop(pq)
-            if d < min_paths[v]:  # new shortest path
-                min_paths[v] = d
-                for vi in range(self.v_count):  # find direct successors and enqueue them with their current path distance to priority queue
-                    if self.adj_matrix[v][vi] != 0:
-                        di = self.adj_matrix[v][vi]
-                        pq.append((d + di, vi))
+        min_paths = [INFINITY] * self.v_count  # list of shortest distances to each vertex
+        for v, d in dist.items():
+            min_paths[v] = d
 
+        if cache is not None:
+            cache.put(src, self.version, min_paths[:], pred)
         return min_paths
 
+    def dijkstra_many(self, sources=None, workers=None, stream=False):
+        """
+        Computes dijkstra(src) for every vertex in sources (all vertices by default) across a pool of worker
+        processes that share one read-only, memory-mapped copy of the graph. workers defaults to the number of CPUs.
+        Returns the distance rows as a list (a dense len(sources) x V matrix, one row per source), or, with
+        stream=True, an iterator that yields the rows in source order as they complete.
+        """
+        if sources is None:
+            sources = range(self.v_count)
+        rows = iter_dijkstra_many(self._storage.csr(), sources, workers)
+        return rows if stream else list(rows)
+
+    def shortest_path(self, src: int, dst: int, max_distance=None, bidirectional=False) -> (float, []):
+        """
+        Returns (distance, path) for the shortest path from src to dst, where path lists the vertices from src to
+        dst. The search stops as soon as dst is settled. If dst is unreachable, farther than max_distance, or either
+        vertex does not exist, returns (INFINITY, []).
+        With bidirectional=True, searches forward from src and backward from dst at the same time, which explores
+        far fewer vertices on large graphs.
+        """
+        if src not in range(0, self.v_count) or dst not in range(0, self.v_count):
+            return INFINITY, []
+
+        stats = traversal_stats('DirectedGraph.shortest_path')
+        if bidirectional:
+            return bidirectional_search(self._storage.csr(), self._storage.reverse_csr(), src, dst, max_distance,
+                                        stats)
+
+        dist, pred = dijkstra_search(self._storage.csr(), src, target=dst, max_distance=max_distance, stats=stats)
+        if dst not in dist:
+            return INFINITY, []
+        return dist[dst], build_path(pred, dst)
+
+    def astar(self, src: int, dst: int, max_distance=None) -> (float, []):
+        """
+        Returns (distance, path) like shortest_path(), found by A* search guided by the landmark lower bounds of
+        build_landmarks(), which settles far fewer vertices than Dijkstra on large graphs. Falls back to
+        shortest_path() if no index was built, and to its bidirectional search while mutations have left the index
+        stale (see rebuild_landmarks()), so a query never pays for the rebuild.
+        """
+        if src not in range(0, self.v_count) or dst not in range(0, self.v_count):
+            return INFINITY, []
+        index = self._landmarks
+        if index is None:
+            return self.shortest_path(src, dst, max_distance)
+        if index.stale:
+            return self.shortest_path(src, dst, max_distance, bidirectional=True)
+        stats = traversal_stats('DirectedGraph.astar')
+        return astar_search(self._storage.csr(), src, dst, index.heuristic(src, dst), max_distance, stats)
+
 
 if __name__ == '__main__':
 
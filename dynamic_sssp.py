@@ -0,0 +1,181 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Shortest-path trees of a DirectedGraph kept up to date incrementally as its edges change
+
+
+import heapq as heap
+
+from shortest_paths import INFINITY
+
+
+class DynamicShortestPaths:
+    """
+    Shortest-path trees from a set of registered sources of a DirectedGraph, repaired after every edge insert,
+    delete and reweight instead of being recomputed (dynamic SSSP in the style of Ramalingam-Reps)
+    - attached to the graph as a mutation observer (see DirectedGraph.track_shortest_paths())
+    - a new or lighter edge u -> v that shortens the path to v runs Dijkstra outward from v, only for as long as
+      distances keep improving
+    - a removed or heavier edge u -> v in a tree re-settles just the subtree below v: each subtree vertex takes its
+      best in-edge from outside the subtree, then Dijkstra runs from those entry points
+    - any other edit costs O(1) per source, so updates cost time proportional to the affected region
+    - keeps its own forward and reverse adjacency dicts (O(V + E)) plus a distance list and parent list per source
+    """
+
+    def __init__(self, graph, sources=()):
+        """
+        Builds the trees of the given sources and starts following the graph's mutations
+        """
+        self.graph = graph
+        self._trees = dict()  # src -> (dist, pred); pred[v] is the parent of v in the tree, -1 if none
+        self._load()
+        for src in sources:
+            self.add_source(src)
+        graph.add_observer(self)
+
+    def _load(self) -> None:
+        """
+        Copies the graph's edges into forward and reverse adjacency dicts
+        """
+        n = self.graph.v_count
+        self._out = [dict() for _ in range(n)]  # out[u] = {v: weight}
+        self._in = [dict() for _ in range(n)]  # in[v] = {u: weight}
+        for u, v, w in self.graph.iter_edges():
+            self._out[u][v] = w
+            self._in[v][u] = w
+
+    @property
+    def sources(self) -> []:
+        """
+        Returns the registered sources
+        """
+        return list(self._trees)
+
+    def add_source(self, src: int) -> None:
+        """
+        Registers src and computes its shortest-path tree with one full Dijkstra search
+        """
+        if src in self._trees:
+            return
+        if not 0 <= src < len(self._out):
+            raise ValueError(f'vertex {src} is not in the graph')
+        dist = [INFINITY] * len(self._out)
+        pred = [-1] * len(self._out)
+        dist[src] = 0
+        self._propagate(dist, pred, [(0, src)])
+        self._trees[src] = (dist, pred)
+
+    def remove_source(self, src: int) -> None:
+        """
+        Stops maintaining the tree of src
+        """
+        self._trees.pop(src, None)
+
+    def close(self) -> None:
+        """
+        Detaches from the graph; the trees stop being updated
+        """
+        self.graph.remove_observer(self)
+
+    def dijkstra(self, src: int) -> []:
+        """
+        Returns the current shortest distances from registered source src in the format of DirectedGraph.dijkstra()
+        """
+        return self._trees[src][0][:]
+
+    def shortest_path(self, src: int, dst: int) -> (float, []):
+        """
+        Returns (distance, path) from registered source src to dst, or (INFINITY, []) if dst is unreachable
+        """
+        dist, pred = self._trees[src]
+        if not 0 <= dst < len(dist) or dist[dst] == INFINITY:
+            return INFINITY, []
+        path = [dst]
+        while path[-1] != src:
+            path.append(pred[path[-1]])
+        path.reverse()
+        return dist[dst], path
+
+    def _propagate(self, dist: [], pred: [], frontier: []) -> None:
+        """
+        Lazy-deletion Dijkstra from the (distance, vertex) entries in frontier, whose distances are already set.
+        Only vertices whose distance improves are expanded.
+        """
+        out = self._out
+        heap.heapify(frontier)
+        while frontier:
+            d, x = heap.heappop(frontier)
+            if d > dist[x]:  # stale entry
+                continue
+            for y, w in out[x].items():
+                dy = d + w
+                if dy < dist[y]:
+                    dist[y] = dy
+                    pred[y] = x
+                    heap.heappush(frontier, (dy, y))
+
+    def _reroute(self, dist: [], pred: [], root: int) -> None:
+        """
+        Recomputes the subtree hanging below root after the tree edge into root was removed or got heavier
+        """
+        subtree = {root}
+        stack = [root]
+        while stack:  # every vertex whose tree path runs through root
+            x = stack.pop()
+            for y in self._out[x]:
+                if pred[y] == x and y not in subtree:
+                    subtree.add(y)
+                    stack.append(y)
+
+        frontier = []
+        for x in subtree:  # best way into each subtree vertex from the unaffected part of the tree
+            best, parent = INFINITY, -1
+            for p, w in self._in[x].items():
+                if p not in subtree and dist[p] + w < best:
+                    best, parent = dist[p] + w, p
+            dist[x], pred[x] = best, parent
+            if parent >= 0:
+                frontier.append((best, x))
+        self._propagate(dist, pred, frontier)
+
+    # mutation observer interface (see DirectedGraph.add_observer())
+
+    def edge_changed(self, graph, src: int, dst: int, old_weight, new_weight) -> None:
+        """
+        Applies the change to edge src -> dst and repairs every tree it affects
+        """
+        if new_weight == 0:
+            del self._out[src][dst]
+            del self._in[dst][src]
+        else:
+            self._out[src][dst] = new_weight
+            self._in[dst][src] = new_weight
+
+        for dist, pred in self._trees.values():
+            if new_weight == 0 or (old_weight and new_weight > old_weight):  # edge removed or heavier
+                if pred[dst] == src:
+                    self._reroute(dist, pred, dst)
+            elif dist[src] + new_weight < dist[dst]:  # edge added or lighter, and it shortens the path to dst
+                dist[dst] = dist[src] + new_weight
+                pred[dst] = src
+                self._propagate(dist, pred, [(dist[dst], dst)])
+
+    def vertex_added(self, graph) -> None:
+        """
+        Adds the new vertex, unreachable from every source
+        """
+        self._out.append(dict())
+        self._in.append(dict())
+        for dist, pred in self._trees.values():
+            dist.append(INFINITY)
+            pred.append(-1)
+
+    def graph_replaced(self, graph) -> None:
+        """
+        Bulk changes: reloads the edges and recomputes every tree (sources that no longer exist are dropped)
+        """
+        sources = [src for src in self._trees if src < graph.v_count]
+        self._trees.clear()
+        self._load()
+        for src in sources:
+            self.add_source(src)
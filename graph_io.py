@@ -0,0 +1,223 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Edge input/output helpers shared by DirectedGraph and UndirectedGraph (bulk edges, binary files)
+
+
+import bz2
+import csv
+import gzip
+import lzma
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import islice, repeat
+
+from graph_storage import CSRGraph, typecode
+
+
+def _column(values):
+    """
+    Returns a column of edge data as something cheap to iterate. NumPy arrays, array.array and memoryview
+    buffers are converted with tolist(), which also turns NumPy scalars into plain Python values.
+    """
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    return values
+
+
+def edge_rows(edges=None, src=None, dst=None, weight=None, default_weight=1):
+    """
+    Normalizes bulk edge input into an iterator of (src, dst, weight) tuples. Input is either
+    - edges: any iterable of (src, dst) or (src, dst, weight) rows, including a 2-D NumPy array, or
+    - src/dst (and optionally weight): equal-length columns (lists, arrays, buffers, 1-D NumPy arrays)
+    Rows without a weight get default_weight.
+    """
+    if edges is not None:
+        for row in _column(edges):
+            if len(row) == 2:
+                yield row[0], row[1], default_weight
+            else:
+                yield row[0], row[1], row[2]
+    elif src is not None and dst is not None:
+        if weight is None:
+            yield from zip(_column(src), _column(dst), repeat(default_weight))
+        else:
+            yield from zip(_column(src), _column(dst), _column(weight), strict=True)
+
+
+_COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'lzma', '.lzma': 'lzma', '.zst': 'zstd'}
+
+
+def open_text(path, mode='r', compression='infer', encoding='utf-8'):
+    """
+    Opens a (possibly compressed) text file for streaming. compression is one of None, 'gzip', 'bz2', 'lzma',
+    'zstd' or 'infer' (pick from the file suffix). zstd uses the standard library's compression.zstd (Python 3.14+).
+    """
+    if compression == 'infer':
+        compression = _COMPRESSION_SUFFIXES.get(os.path.splitext(str(path))[1].lower())
+
+    mode += 't'
+    if compression is None:
+        return open(path, mode, encoding=encoding, newline='')
+    if compression == 'gzip':
+        return gzip.open(path, mode, encoding=encoding, newline='')
+    if compression == 'bz2':
+        return bz2.open(path, mode, encoding=encoding, newline='')
+    if compression == 'lzma':
+        return lzma.open(path, mode, encoding=encoding, newline='')
+    if compression == 'zstd':
+        try:
+            from compression import zstd
+        except ImportError:
+            raise ValueError('zstd files need Python 3.14+ (compression.zstd)') from None
+        return zstd.open(path, mode, encoding=encoding, newline='')
+    raise ValueError(f'unknown compression {compression!r}')
+
+
+def read_edge_list(path, delimiter=None, columns=(0, 1), header=False, vertex_type=str, weight_type=int,
+                   comment='#', chunk_size=100_000, compression='infer'):
+    """
+    Streams a delimited edge-list text file (optionally compressed) and yields the edges in chunks: lists of at most
+    chunk_size (src, dst) or (src, dst, weight) tuples, so only one chunk of the file is held in memory at a time.
+    - delimiter: field separator (e.g. ',' or '\t', parsed with the csv module), or None to split on whitespace
+    - columns: positions (or, with header=True, header names) of the src, dst and optional weight fields
+    - vertex_type / weight_type: converters applied to the vertex and weight fields
+    - blank lines and lines starting with comment are skipped
+    """
+    with open_text(path, 'r', compression) as f:
+        lines = (line for line in f if line.strip() and not (comment and line.startswith(comment)))
+        if delimiter is None:
+            rows = (line.split() for line in lines)
+        else:
+            rows = csv.reader(lines, delimiter=delimiter)
+
+        if header:
+            names = next(rows, [])
+            columns = [names.index(c) if isinstance(c, str) else c for c in columns]
+        src, dst = columns[0], columns[1]
+        weight = columns[2] if len(columns) > 2 else None
+
+        if weight is None:
+            edges = ((vertex_type(row[src]), vertex_type(row[dst])) for row in rows)
+        else:
+            edges = ((vertex_type(row[src]), vertex_type(row[dst]), weight_type(row[weight])) for row in rows)
+
+        while True:
+            chunk = list(islice(edges, chunk_size))
+            if len(chunk) == 0:
+                return
+            yield chunk
+
+
+def write_edge_list(path, edges, delimiter='\t', chunk_size=100_000, compression='infer') -> int:
+    """
+    Writes an iterable of edge tuples (e.g. a graph's iter_edges()) to a delimited, optionally compressed text file,
+    chunk_size lines at a time. Returns the number of edges written.
+    """
+    count = 0
+    edges = iter(edges)
+    with open_text(path, 'w', compression) as out:
+        while True:
+            chunk = list(islice(edges, chunk_size))
+            if len(chunk) == 0:
+                return count
+            out.write(''.join(delimiter.join(map(str, edge)) + '\n' for edge in chunk))
+            count += len(chunk)
+
+
+# Binary graph file layout (all integers little-endian, every section starts on an 8-byte boundary):
+#   header   magic, format version, flags, vertex count, stored edge count, name blob size, column typecodes
+#   offsets  int64 x (V + 1)
+#   targets  int32/int64 x E
+#   weights  int64/float64 x E               (weighted graphs only)
+#   names    int64 x (V + 1) offsets, utf-8 (named graphs only)
+_MAGIC = b'DSGRAPH\x00'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIIQQQ2s6x')
+DIRECTED, WEIGHTED, NAMED = 1, 2, 4  # header flags
+
+
+def _padding(size: int) -> int:
+    """
+    Returns the number of zero bytes that pad a section of the given size to an 8-byte boundary
+    """
+    return -size % 8
+
+
+def save_csr(path, csr: CSRGraph, directed: bool, names=None) -> None:
+    """
+    Writes a CSRGraph (and, for named graphs, the vertex name of every id) to path in the binary graph format.
+    Raises ValueError if the weights cannot be stored exactly in one int64 or float64 column.
+    """
+    if sys.byteorder != 'little':
+        raise ValueError('the binary graph format is little-endian')
+
+    if csr.weight_code == 'O':
+        raise ValueError('the binary graph format stores int64 or float64 weights; this graph mixes weight types '
+                         '(or has ints beyond 64 bits) - use write_edge_list() instead')
+    flags = (DIRECTED if directed else 0) | (WEIGHTED if csr.weights is not None else 0)
+    codes = typecode(csr.targets) + (csr.weight_code or 'x')
+    blob, name_offsets = b'', None
+    if names is not None:
+        flags |= NAMED
+        encoded = [name.encode('utf-8') for name in names]
+        name_offsets = array('q', [0])
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+        blob = b''.join(encoded)
+
+    with open(path, 'wb') as out:
+        out.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, flags, csr.v_count, len(csr.targets), len(blob),
+                               codes.encode('ascii')))
+        sections = [csr.offsets, csr.targets]
+        if csr.weights is not None:
+            sections.append(csr.weights)
+        if names is not None:
+            sections += [name_offsets, blob]
+        for section in sections:
+            data = memoryview(section).cast('B')
+            out.write(data)
+            out.write(bytes(_padding(len(data))))
+
+
+def load_csr(path, use_mmap=True) -> (CSRGraph, bool, []):
+    """
+    Reads a graph written by save_csr(). Returns (csr, directed, names), where names is None for unnamed graphs.
+    With use_mmap, the file is mapped read-only and the CSR columns are memoryviews straight into the mapping:
+    loading is O(1) apart from decoding the name table, and processes that load the same file share its pages.
+    """
+    with open(path, 'rb') as f:
+        if use_mmap:
+            buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            buf = memoryview(f.read())
+
+    magic, version, flags, v_count, e_count, blob_size, codes = _HEADER.unpack_from(buf)
+    if magic != _MAGIC:
+        raise ValueError(f'{path} is not a graph file')
+    if version != _FORMAT_VERSION:
+        raise ValueError(f'unsupported graph file version {version}')
+    target_code, weight_code = codes.decode('ascii')
+
+    pos = _HEADER.size
+
+    def section(count, code):
+        nonlocal pos
+        size = count * array(code).itemsize
+        view = buf[pos:pos + size].cast(code)
+        pos += size + _padding(size)
+        return view
+
+    offsets = section(v_count + 1, 'q')
+    targets = section(e_count, target_code)
+    weights = section(e_count, weight_code) if flags & WEIGHTED else None
+    names = None
+    if flags & NAMED:
+        name_offsets = section(v_count + 1, 'q')
+        blob = buf[pos:pos + blob_size]
+        names = [str(blob[name_offsets[i]:name_offsets[i + 1]], 'utf-8') for i in range(v_count)]
+
+    return CSRGraph(v_count, offsets, targets, weights), bool(flags & DIRECTED), names
@@ -0,0 +1,706 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Sparse storage backends for the graph classes (adjacency dicts + compressed sparse rows)
+
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import repeat
+
+np = None  # numpy is optional - only DenseStorage needs it, so it is imported by the first one created (see _numpy())
+
+
+def _numpy():
+    """
+    Imports numpy on first use, so graphs that never use DenseStorage do not pay for loading it
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('DenseStorage requires numpy') from None
+        np = numpy
+    return np
+
+
+def typecode(column) -> str:
+    """
+    Returns the array typecode of a CSR column, which is either an array.array or a memoryview (e.g. over a
+    memory-mapped file), or 'O' for a plain list of Python numbers (see _weight_array())
+    """
+    if isinstance(column, list):
+        return 'O'
+    return getattr(column, 'typecode', None) or column.format
+
+
+def _copy_column(column) -> array:
+    """
+    Copies a CSR column (array or memoryview) into a new array of the same typecode with a single buffer copy.
+    List columns are copied into a new list.
+    """
+    if isinstance(column, list):
+        return column[:]
+    out = array(typecode(column))
+    out.frombytes(memoryview(column).cast('B'))
+    return out
+
+
+def _weight_array(weights: []):
+    """
+    Packs edge weights into a typed array: signed 64-bit values if every weight is an int that fits, doubles if
+    every weight is a float. Any other mix (ints and floats together, ints beyond 64 bits, other number types) is
+    kept as a plain list, so every weight comes back out exactly as it went in.
+    """
+    try:
+        return array('q', weights)
+    except (TypeError, OverflowError):
+        pass
+    if all(isinstance(weight, float) for weight in weights):
+        return array('d', weights)
+    return list(weights)
+
+
+def _zeros(code: str, count: int):
+    """
+    Returns a column of count zeros with the given typecode (a list for 'O')
+    """
+    return [0] * count if code == 'O' else array(code, [0]) * count
+
+
+def pack_paths(paths) -> ([], array):
+    """
+    Packs a ragged batch of paths (an iterable of vertex sequences) into the flat layout taken by the batch
+    validators: path p is flat[offsets[p]:offsets[p+1]]
+    """
+    flat = []
+    offsets = array('q', [0])
+    for path in paths:
+        flat.extend(path)
+        offsets.append(len(flat))
+    return flat, offsets
+
+
+class CSRGraph:
+    """
+    Immutable compressed sparse row (CSR) view of a directed graph
+    - the out-edges of vertex v are targets[offsets[v]:offsets[v+1]] (with matching weights)
+    - targets within each row are in ascending order (by id, unless the builder chose another order)
+    - weights is None for unweighted graphs; every edge then has weight 1
+    - weights is an int64 or double array, or a plain list when the weights mix types (see _weight_array())
+    - memory is proportional to V + E
+    """
+
+    def __init__(self, v_count: int, offsets, targets, weights):
+        """
+        Store the three CSR columns. offsets must have v_count + 1 entries
+        """
+        self.v_count = v_count
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_rows(cls, rows: []) -> 'CSRGraph':
+        """
+        Compacts a list of {dst: weight} dicts (one per vertex) into CSR form
+        """
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = []
+
+        for row in rows:
+            for dst in sorted(row):  # rows are kept in ascending order so traversals can read them directly
+                targets.append(dst)
+                weights.append(row[dst])
+            offsets.append(len(targets))
+
+        return cls(len(rows), offsets, targets, _weight_array(weights))
+
+    @classmethod
+    def from_neighbor_lists(cls, lists, typecode='i') -> 'CSRGraph':
+        """
+        Compacts already-ordered neighbor sequences (one per vertex) into an unweighted CSR. Targets default to
+        32-bit ids, i.e. 4 bytes per stored neighbor.
+        """
+        offsets = array('q', [0])
+        targets = array(typecode)
+        for neighbors in lists:
+            targets.extend(neighbors)
+            offsets.append(len(targets))
+        return cls(len(offsets) - 1, offsets, targets, None)
+
+    @property
+    def weight_code(self) -> str:
+        """
+        Returns the array typecode of the weights column ('q' for integer weights, 'd' for floats, 'O' for a list of
+        exact mixed weights, None if the graph is unweighted). Works for array.array columns as well as memoryview
+        columns mapped from a file.
+        """
+        if self.weights is None:
+            return None
+        return typecode(self.weights)
+
+    @property
+    def e_count(self) -> int:
+        """
+        Returns the number of edges stored
+        """
+        return len(self.targets)
+
+    def neighbors(self, v: int):
+        """
+        Returns the direct successors of v in ascending order
+        """
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def out_edges(self, v: int):
+        """
+        Returns an iterator of (dst, weight) pairs for the out-edges of v in ascending dst order
+        """
+        lo, hi = self.offsets[v], self.offsets[v + 1]
+        if self.weights is None:
+            return zip(self.targets[lo:hi], repeat(1))
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    def degree(self, v: int) -> int:
+        """
+        Returns the out-degree of v
+        """
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def weight(self, src: int, dst: int):
+        """
+        Returns the weight of edge src -> dst, or 0 if there is no such edge. Binary search over the row of src.
+        """
+        lo, hi = self.offsets[src], self.offsets[src + 1]
+        i = bisect_left(self.targets, dst, lo, hi)
+        if i < hi and self.targets[i] == dst:
+            return 1 if self.weights is None else self.weights[i]
+        return 0
+
+    def edges(self):
+        """
+        Yields every edge as a (src, dst, weight) tuple, ordered by src then dst
+        """
+        for src in range(self.v_count):
+            for dst, weight in self.out_edges(src):
+                yield src, dst, weight
+
+    def transpose(self) -> 'CSRGraph':
+        """
+        Returns the CSR of the reversed graph (every edge src -> dst becomes dst -> src). Counting sort, O(V + E).
+        """
+        offsets = array('q', [0]) * (self.v_count + 1)
+        for dst in self.targets:  # in-degree of each vertex
+            offsets[dst + 1] += 1
+        for v in range(self.v_count):
+            offsets[v + 1] += offsets[v]
+
+        targets = array('q', [0]) * len(self.targets)
+        weights = None if self.weights is None else _zeros(self.weight_code, len(self.weights))
+        fill = offsets[:-1]  # next free slot in each reversed row
+        for src in range(self.v_count):  # ascending src keeps every reversed row sorted
+            for i in range(self.offsets[src], self.offsets[src + 1]):
+                dst = self.targets[i]
+                targets[fill[dst]] = src
+                if weights is not None:
+                    weights[fill[dst]] = self.weights[i]
+                fill[dst] += 1
+
+        return CSRGraph(self.v_count, offsets, targets, weights)
+
+    def edge_columns(self) -> (array, array, array):
+        """
+        Returns the edges as parallel (src, dst, weight) arrays ordered by src then dst, without building a tuple per
+        edge. weight is None for unweighted graphs, and a list if the weights mix types. The arrays support the buffer
+        protocol, so e.g. numpy.frombuffer(src, dtype=numpy.int64) wraps them without copying.
+        """
+        src = array('q')
+        for v in range(self.v_count):
+            src.extend(repeat(v, self.offsets[v + 1] - self.offsets[v]))
+        dst = _copy_column(self.targets)
+        weights = None if self.weights is None else _copy_column(self.weights)
+        return src, dst, weights
+
+    def row(self, src: int) -> []:
+        """
+        Returns a dense row of the adjacency matrix for src (0 where there is no edge)
+        """
+        out = [0] * self.v_count
+        for dst, weight in self.out_edges(src):
+            out[dst] = weight
+        return out
+
+    def validate_paths(self, flat, offsets, weighted=False, key=None) -> (bytearray, array):
+        """
+        Checks a batch of paths packed as flat vertex ids plus offsets (see pack_paths()). A path is valid if every
+        pair of consecutive vertices is in range and joined by an edge; paths with fewer than two vertices are
+        valid. Returns (valid, totals): valid has a 1 byte for each valid path, and totals holds the summed edge
+        weight of each path (0 for invalid paths) if weighted is True, else None.
+        Each hop is one binary search over its row, so the batch costs O(sum of path lengths * log deg). Rows must be
+        sorted by id, or by key(id) if key is given.
+        """
+        n = self.v_count
+        row_offsets, targets, weights = self.offsets, self.targets, self.weights
+        count = len(offsets) - 1
+        valid = bytearray(count)
+        totals = _zeros(self.weight_code or 'q', count) if weighted else None
+
+        for p in range(count):
+            lo, hi = offsets[p], offsets[p + 1]
+            src = flat[lo] if lo < hi else 0
+            total = 0
+            for k in range(lo + 1, hi):
+                dst = flat[k]
+                if not (0 <= src < n and 0 <= dst < n):  # bounds check
+                    break
+                end = row_offsets[src + 1]
+                if key is None:
+                    i = bisect_left(targets, dst, row_offsets[src], end)
+                else:
+                    i = bisect_left(targets, key(dst), row_offsets[src], end, key=key)
+                if i == end or targets[i] != dst:  # no edge src -> dst
+                    break
+                if weighted:
+                    total += 1 if weights is None else weights[i]
+                src = dst
+            else:
+                valid[p] = 1
+                if weighted:
+                    totals[p] = total
+
+        return valid, totals
+
+
+class SparseStorage:
+    """
+    Default DirectedGraph backend
+    - while the graph is being mutated, each vertex keeps a {dst: weight} dict of its out-edges
+    - reads go through a CSRGraph that is compacted on first use and dropped by the next mutation
+    - compact() releases the dicts entirely; they are rebuilt from the CSR arrays on the next mutation
+    """
+
+    def __init__(self, v_count: int = 0):
+        self._rows = [dict() for _ in range(v_count)]
+        self._csr = None
+        self._reverse = None
+        self.version = 0  # bumped by every mutation that changes the graph
+
+    @classmethod
+    def from_matrix(cls, matrix: []) -> 'SparseStorage':
+        """
+        Builds storage from a dense adjacency matrix (list of rows, 0 meaning no edge)
+        """
+        storage = cls(len(matrix))
+        for src, row in enumerate(matrix):
+            storage._rows[src] = {dst: weight for dst, weight in enumerate(row) if weight != 0}
+        return storage
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph) -> 'SparseStorage':
+        """
+        Wraps an existing (e.g. memory-mapped) CSRGraph in compacted form. Nothing is copied until the first mutation.
+        """
+        storage = cls()
+        storage._rows = None
+        storage._csr = csr
+        return storage
+
+    @property
+    def v_count(self) -> int:
+        """
+        Returns the number of vertices stored
+        """
+        if self._rows is None:
+            return self._csr.v_count
+        return len(self._rows)
+
+    def _thaw(self) -> []:
+        """
+        Returns the mutable rows, rebuilding them from the CSR arrays if the storage was compacted
+        """
+        if self._rows is None:
+            self._rows = [dict(self._csr.out_edges(src)) for src in range(self._csr.v_count)]
+        return self._rows
+
+    def _changed(self) -> None:
+        """
+        Invalidates the compacted view after a mutation
+        """
+        self._csr = None
+        self._reverse = None
+        self.version += 1
+
+    def add_vertex(self) -> int:
+        """
+        Appends a vertex with no edges and returns the new vertex count. O(1).
+        """
+        rows = self._thaw()
+        rows.append(dict())
+        self._changed()
+        return len(rows)
+
+    def add_vertices(self, count: int) -> int:
+        """
+        Appends count vertices with no edges and returns the new vertex count
+        """
+        rows = self._thaw()
+        if count > 0:
+            rows.extend(dict() for _ in range(count))
+            self._changed()
+        return len(rows)
+
+    def set_edges(self, edges) -> None:
+        """
+        Adds or updates every (src, dst, weight) edge in one pass, growing the vertex set to fit the largest id.
+        Assumes ids are non-negative and the edges are otherwise valid. O(V + E).
+        """
+        rows = self._thaw()
+        for src, dst, weight in edges:
+            top = src if src > dst else dst
+            if top >= len(rows):
+                rows.extend(dict() for _ in range(top + 1 - len(rows)))
+            rows[src][dst] = weight
+        self._changed()
+
+    def set_edge(self, src: int, dst: int, weight) -> None:
+        """
+        Adds edge src -> dst or updates its weight. Assumes both vertices exist.
+        """
+        row = self._thaw()[src]
+        if row.get(dst) != weight:
+            row[dst] = weight
+            self._changed()
+
+    def remove_edge(self, src: int, dst: int) -> None:
+        """
+        Removes edge src -> dst if it exists
+        """
+        if self.weight(src, dst) != 0:
+            del self._thaw()[src][dst]
+            self._changed()
+
+    def weight(self, src: int, dst: int):
+        """
+        Returns the weight of edge src -> dst, or 0 if there is no such edge
+        """
+        if self._rows is None:
+            return self._csr.weight(src, dst)
+        return self._rows[src].get(dst, 0)
+
+    def row(self, src: int) -> []:
+        """
+        Returns a dense adjacency matrix row for src
+        """
+        if self._rows is None:
+            return self._csr.row(src)
+        out = [0] * len(self._rows)
+        for dst, weight in self._rows[src].items():
+            out[dst] = weight
+        return out
+
+    def csr(self) -> CSRGraph:
+        """
+        Returns the compacted read view, building it if the graph changed since the last call. O(V + E log deg).
+        """
+        if self._csr is None:
+            self._csr = CSRGraph.from_rows(self._rows)
+        return self._csr
+
+    def reverse_csr(self) -> CSRGraph:
+        """
+        Returns the compacted view of the reversed graph (in-edges), cached until the next mutation
+        """
+        if self._reverse is None:
+            self._reverse = self.csr().transpose()
+        return self._reverse
+
+    def compact(self) -> CSRGraph:
+        """
+        Compacts the graph into CSR form and frees the per-vertex dicts
+        """
+        csr = self.csr()
+        self._rows = None
+        return csr
+
+    def hop_distances(self, src: int) -> array:
+        """
+        Returns the number of edges on a shortest (unweighted) path from src to every vertex, -1 if unreachable.
+        Level-by-level BFS over the CSR rows - O(V + E).
+        """
+        csr = self.csr()
+        hops = array('q', [-1]) * csr.v_count
+        hops[src] = 0
+        queue = deque([src])
+        while len(queue) != 0:
+            v = queue.popleft()
+            for u in csr.neighbors(v):
+                if hops[u] == -1:
+                    hops[u] = hops[v] + 1
+                    queue.append(u)
+        return hops
+
+    def reachable_within(self, src: int, k: int) -> []:
+        """
+        Returns the vertices reachable from src in at most k hops, in ascending order
+        """
+        csr = self.csr()
+        seen = bytearray(csr.v_count)
+        seen[src] = 1
+        frontier = [src]
+        for _ in range(k):
+            if len(frontier) == 0:
+                break
+            following = []
+            for v in frontier:
+                for u in csr.neighbors(v):
+                    if not seen[u]:
+                        seen[u] = 1
+                        following.append(u)
+            frontier = following
+        return [v for v in range(csr.v_count) if seen[v]]
+
+    def out_degrees(self) -> array:
+        """
+        Returns the out-degree of every vertex
+        """
+        offsets = self.csr().offsets
+        return array('q', [offsets[v + 1] - offsets[v] for v in range(len(offsets) - 1)])
+
+    def in_degrees(self) -> array:
+        """
+        Returns the in-degree of every vertex
+        """
+        degrees = array('q', [0]) * self.v_count
+        for dst in self.csr().targets:
+            degrees[dst] += 1
+        return degrees
+
+
+class DenseStorage:
+    """
+    NumPy-backed DirectedGraph backend for dense graphs
+    - the adjacency matrix is one contiguous ndarray, over-allocated and grown geometrically by add_vertex()
+    - neighbor rows are extracted with np.nonzero, and the bulk operations (hop distances, k-hop reachability,
+      degrees) work a whole frontier or matrix at a time instead of cell by cell in the interpreter
+    - traversals read the same CSRGraph as the sparse backend, compacted from the matrix in one vectorized pass
+    - weights are int64 until the first non-integer weight, after which the whole matrix (and every weight read
+      back) is float64
+    Requires numpy.
+    """
+
+    def __init__(self, v_count: int = 0):
+        _numpy()
+        self._n = v_count
+        self._matrix = np.zeros((max(v_count, 4), max(v_count, 4)), dtype=np.int64)
+        self._csr = None
+        self._reverse = None
+        self.version = 0
+
+    @classmethod
+    def from_matrix(cls, matrix: []) -> 'DenseStorage':
+        """
+        Builds storage from a dense adjacency matrix (list of rows or 2-D array, 0 meaning no edge)
+        """
+        storage = cls(len(matrix))
+        if len(matrix) > 0:
+            values = np.asarray(matrix)
+            if values.dtype.kind == 'f':
+                storage._matrix = storage._matrix.astype(np.float64)
+            storage._matrix[:len(matrix), :len(matrix)] = values
+        return storage
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph) -> 'DenseStorage':
+        """
+        Builds storage from a CSRGraph with one vectorized scatter
+        """
+        storage = cls(csr.v_count)
+        src, dst, weights = csr.edge_columns()
+        if csr.weight_code in ('d', 'O'):  # mixed weights are stored as doubles, like a mixed matrix
+            storage._matrix = storage._matrix.astype(np.float64)
+        if csr.weight_code == 'O':
+            values = np.asarray(weights, dtype=np.float64)
+        else:
+            values = np.frombuffer(weights, dtype=np.float64 if csr.weight_code == 'd' else np.int64)
+        storage._matrix[np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64)] = values
+        return storage
+
+    @property
+    def v_count(self) -> int:
+        return self._n
+
+    def _view(self):
+        """
+        Returns the in-use part of the matrix (a view, not a copy)
+        """
+        return self._matrix[:self._n, :self._n]
+
+    def _changed(self) -> None:
+        self._csr = None
+        self._reverse = None
+        self.version += 1
+
+    def _reserve(self, n: int) -> None:
+        """
+        Makes room for n vertices, at least doubling the capacity so add_vertex() is amortized O(V)
+        """
+        capacity = self._matrix.shape[0]
+        if n > capacity:
+            capacity = max(n, 2 * capacity)
+            grown = np.zeros((capacity, capacity), dtype=self._matrix.dtype)
+            grown[:self._n, :self._n] = self._view()
+            self._matrix = grown
+
+    def _fit_weight(self, weight) -> None:
+        """
+        Switches the matrix to float64 the first time a non-integer weight is stored
+        """
+        if self._matrix.dtype != np.float64 and not float(weight).is_integer():
+            self._matrix = self._matrix.astype(np.float64)
+
+    def add_vertex(self) -> int:
+        self._reserve(self._n + 1)
+        self._n += 1
+        self._changed()
+        return self._n
+
+    def add_vertices(self, count: int) -> int:
+        if count > 0:
+            self._reserve(self._n + count)
+            self._n += count
+            self._changed()
+        return self._n
+
+    def set_edges(self, edges) -> None:
+        """
+        Adds or updates every (src, dst, weight) edge with one vectorized scatter, growing the vertex set to fit
+        """
+        edges = list(edges)
+        if len(edges) == 0:
+            return
+        src, dst, weights = (np.asarray(column) for column in zip(*edges))
+        if weights.dtype.kind == 'f':
+            self._fit_weight(0.5)
+        self.add_vertices(int(max(src.max(), dst.max())) + 1 - self._n)
+        self._matrix[src, dst] = weights
+        self._changed()
+
+    def set_edge(self, src: int, dst: int, weight) -> None:
+        self._fit_weight(weight)
+        if self._matrix[src, dst] != weight:
+            self._matrix[src, dst] = weight
+            self._changed()
+
+    def remove_edge(self, src: int, dst: int) -> None:
+        if self._matrix[src, dst] != 0:
+            self._matrix[src, dst] = 0
+            self._changed()
+
+    def weight(self, src: int, dst: int):
+        # absent edges read as int 0 even once the matrix has been promoted to float64
+        return self._matrix[src, dst].item() or 0
+
+    def row(self, src: int) -> []:
+        return [w or 0 for w in self._matrix[src, :self._n].tolist()]
+
+    def csr(self) -> CSRGraph:
+        """
+        Compacts the matrix into a CSRGraph with np.nonzero (row-major, so rows come out sorted)
+        """
+        if self._csr is None:
+            view = self._view()
+            src, dst = np.nonzero(view)
+            offsets = np.zeros(self._n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(src, minlength=self._n), out=offsets[1:])
+            weights = view[src, dst]
+            self._csr = CSRGraph(self._n, _int64_array(offsets), _int64_array(dst),
+                                 array('d', weights.tobytes()) if weights.dtype == np.float64
+                                 else _int64_array(weights))
+        return self._csr
+
+    def reverse_csr(self) -> CSRGraph:
+        if self._reverse is None:
+            self._reverse = self.csr().transpose()
+        return self._reverse
+
+    def compact(self) -> CSRGraph:
+        return self.csr()
+
+    def hop_distances(self, src: int):
+        """
+        Frontier-at-a-time BFS: each level is one boolean matrix-vector product. Returns the hop counts as an int64
+        array.array (like SparseStorage), -1 where unreachable.
+        """
+        adjacency = self._view() != 0
+        hops = np.full(self._n, -1, dtype=np.int64)
+        hops[src] = 0
+        frontier = np.zeros(self._n, dtype=bool)
+        frontier[src] = True
+        level = 0
+        while frontier.any():
+            level += 1
+            frontier = (frontier @ adjacency) & (hops == -1)  # successors of the frontier not seen yet
+            hops[frontier] = level
+        return _int64_array(hops)
+
+    def reachable_within(self, src: int, k: int) -> []:
+        """
+        Returns the vertices reachable from src in at most k hops, in ascending order (k boolean products)
+        """
+        adjacency = self._view() != 0
+        seen = np.zeros(self._n, dtype=bool)
+        seen[src] = True
+        frontier = seen.copy()
+        for _ in range(k):
+            frontier = (frontier @ adjacency) & ~seen
+            if not frontier.any():
+                break
+            seen |= frontier
+        return np.flatnonzero(seen).tolist()
+
+    def out_degrees(self) -> array:
+        return _int64_array(np.count_nonzero(self._view(), axis=1))
+
+    def in_degrees(self) -> array:
+        return _int64_array(np.count_nonzero(self._view(), axis=0))
+
+
+def _int64_array(values) -> array:
+    """
+    Copies an integer ndarray into an int64 array.array (the CSR column type)
+    """
+    return array('q', values.astype(np.int64).tobytes())
+
+
+class MatrixView:
+    """
+    Read-only, dense view of a storage backend that behaves like the original list-of-lists adjacency matrix.
+    Rows are materialized on access, so indexing a row costs O(V). They come back as tuples, so an assignment like
+    adj_matrix[i][j] = w fails instead of silently changing a copy; use add_edge() to change the graph.
+    """
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def __len__(self) -> int:
+        return self._storage.v_count
+
+    def __getitem__(self, src: int) -> tuple:
+        if not 0 <= src < self._storage.v_count:
+            raise IndexError('adjacency matrix row out of range')
+        return tuple(self._storage.row(src))
+
+    def __iter__(self):
+        for src in range(self._storage.v_count):
+            yield tuple(self._storage.row(src))
+
+    def __eq__(self, other) -> bool:
+        # compare rows by value, so the view equals the equivalent list of lists
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self) -> str:
+        return repr([list(row) for row in self])
@@ -0,0 +1,229 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Opt-in profiling of the graph classes (call counts, latency histograms, traversal counters)
+
+
+import functools
+import threading
+from time import perf_counter
+
+_recorder = None  # the active Recorder, or None while instrumentation is disabled
+_patched = []  # (class, attribute name, original attribute) replaced by enable()
+
+
+class TraversalStats:
+    """
+    Work counters accumulated over every traversal run by one graph method
+    - traversals: number of traversals started
+    - expanded: vertices whose neighbors were scanned
+    - edges: neighbor entries scanned (edges relaxed, for Dijkstra)
+    - heap_pops / heap_pushes: priority queue operations (Dijkstra only; pops include stale entries)
+    - max_frontier: largest queue / stack / heap seen
+    Traversals call expand() once per expanded vertex (and pop() once per heap pop) only when they were handed a
+    TraversalStats, so uninstrumented traversals pay nothing.
+    """
+
+    __slots__ = ('traversals', 'expanded', 'edges', 'heap_pops', 'heap_pushes', 'max_frontier')
+
+    def __init__(self):
+        self.traversals = 0
+        self.expanded = 0
+        self.edges = 0
+        self.heap_pops = 0
+        self.heap_pushes = 0
+        self.max_frontier = 0
+
+    def expand(self, frontier: int, degree: int) -> None:
+        """
+        Records one expanded vertex with degree neighbors, scanned while the frontier held frontier entries
+        """
+        self.expanded += 1
+        self.edges += degree
+        if frontier > self.max_frontier:
+            self.max_frontier = frontier
+
+    def pop(self, heap_size: int) -> None:
+        """
+        Records one heap pop taken from a heap of heap_size entries
+        """
+        self.heap_pops += 1
+        if heap_size > self.max_frontier:
+            self.max_frontier = heap_size
+
+    def as_dict(self) -> {}:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Histogram:
+    """
+    Latency histogram with power-of-two microsecond buckets: bucket b counts calls that took [2^(b-1), 2^b) us
+    """
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = dict()
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def as_dict(self) -> {}:
+        """
+        Returns count, total/max seconds, and {bucket upper bound in us: calls} in ascending order
+        """
+        return {'count': self.count, 'total': self.total, 'max': self.max,
+                'buckets': {2 ** b: self.buckets[b] for b in sorted(self.buckets)}}
+
+
+class Recorder:
+    """
+    Collects the measurements while instrumentation is enabled and hands them to the registered exporters
+    """
+
+    def __init__(self):
+        self.latency = dict()  # method name -> Histogram
+        self.traversals = dict()  # method name -> TraversalStats
+        self.exporters = []
+        self._lock = threading.Lock()  # guards creation of new entries
+
+    def record_call(self, name: str, seconds: float) -> None:
+        histogram = self.latency.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.latency.setdefault(name, Histogram())
+        histogram.add(seconds)
+
+    def traversal(self, name: str) -> TraversalStats:
+        stats = self.traversals.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.traversals.setdefault(name, TraversalStats())
+        stats.traversals += 1
+        return stats
+
+    def as_dict(self) -> {}:
+        """
+        Returns every measurement as plain dicts:
+        {'calls': {method: count}, 'latency': {method: histogram}, 'traversals': {method: counters}}
+        """
+        return {'calls': {name: h.count for name, h in sorted(self.latency.items())},
+                'latency': {name: h.as_dict() for name, h in sorted(self.latency.items())},
+                'traversals': {name: s.as_dict() for name, s in sorted(self.traversals.items())}}
+
+
+def traversal_stats(name: str):
+    """
+    Returns the TraversalStats a traversal run by method name should update, or None while instrumentation is
+    disabled. Graph methods call this once per traversal and pass the result down to the traversal loop.
+    """
+    recorder = _recorder
+    return None if recorder is None else recorder.traversal(name)
+
+
+def _timed(name: str, method):
+    """
+    Wraps method so that each call is counted and timed into the active recorder
+    """
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            recorder = _recorder
+            if recorder is not None:
+                recorder.record_call(name, perf_counter() - start)
+    return timed
+
+
+def _graph_classes() -> ():
+    from d_graph import DirectedGraph  # imported here because the graph modules import this one
+    from ud_graph import UndirectedGraph
+    return DirectedGraph, UndirectedGraph
+
+
+def enable(exporter=None, classes=None) -> Recorder:
+    """
+    Starts recording and returns the Recorder. Every public method of the graph classes (DirectedGraph and
+    UndirectedGraph unless classes is given) is wrapped to count calls and time them, and traversals update their
+    TraversalStats. Nothing is wrapped while instrumentation is disabled, so it costs nothing until enabled.
+    exporter, if given, is registered with add_exporter().
+    """
+    global _recorder
+    if _recorder is None:
+        for cls in classes or _graph_classes():
+            for attr, value in list(vars(cls).items()):
+                if attr.startswith('_') or isinstance(value, (property, type)):
+                    continue
+                name = f'{cls.__name__}.{attr}'
+                if isinstance(value, (classmethod, staticmethod)):
+                    wrapped = type(value)(_timed(name, value.__func__))
+                elif callable(value):
+                    wrapped = _timed(name, value)
+                else:
+                    continue
+                _patched.append((cls, attr, value))
+                setattr(cls, attr, wrapped)
+        _recorder = Recorder()
+    if exporter is not None:
+        add_exporter(exporter)
+    return _recorder
+
+
+def disable() -> None:
+    """
+    Flushes the measurements to the exporters, restores the original methods and stops recording
+    """
+    global _recorder
+    if _recorder is None:
+        return
+    export()
+    while _patched:
+        cls, attr, value = _patched.pop()
+        setattr(cls, attr, value)
+    _recorder = None
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+def add_exporter(exporter) -> None:
+    """
+    Registers exporter(stats) to receive Recorder.as_dict() on every export() (e.g. to ship to a metrics pipeline)
+    """
+    if _recorder is None:
+        raise RuntimeError('instrumentation is not enabled')
+    _recorder.exporters.append(exporter)
+
+
+def stats() -> {}:
+    """
+    Returns the current measurements (see Recorder.as_dict()), or an empty dict while disabled
+    """
+    return {} if _recorder is None else _recorder.as_dict()
+
+
+def export(reset=False) -> {}:
+    """
+    Sends the current measurements to every exporter and returns them. With reset=True recording starts over
+    afterwards, so each export covers one interval.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return {}
+    measurements = recorder.as_dict()
+    for exporter in recorder.exporters:
+        exporter(measurements)
+    if reset:
+        recorder.latency, recorder.traversals = dict(), dict()
+    return measurements
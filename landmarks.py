@@ -0,0 +1,208 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Landmark (ALT) distance index giving A* lower bounds for point-to-point queries on DirectedGraph
+
+
+import mmap
+import random
+import struct
+import sys
+from array import array
+
+from shortest_paths import INFINITY, dijkstra_search
+
+_MAGIC = b'DSLMARK\x00'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIIQQ')  # magic, format version, landmark count, vertex count, edge count
+
+
+class LandmarkIndex:
+    """
+    ALT (A*, landmarks, triangle inequality) index of a DirectedGraph
+    - for each of k landmark vertices L it stores d(L, v) and d(v, L) for every vertex v, as one array of doubles
+      per landmark and direction (INFINITY where unreachable), i.e. 16 * k * V bytes
+    - by the triangle inequality, d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L), so the largest of
+      these bounds is an admissible, consistent A* heuristic (see heuristic())
+    - attached to the graph as a mutation observer: an edit that cannot change any landmark distance keeps the
+      index valid; any other edit marks it stale, and astar() falls back to bidirectional Dijkstra until
+      DirectedGraph.rebuild_landmarks()
+    - landmarks are picked greedily, each as far as possible from the ones already chosen
+    """
+
+    def __init__(self, landmarks: [], forward: [], backward: [], e_count: int):
+        """
+        Wrap precomputed sweeps: forward[i][v] = d(landmarks[i], v) and backward[i][v] = d(v, landmarks[i]).
+        e_count is the edge count of the graph the sweeps came from (checked when the index is attached).
+        """
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.e_count = e_count
+        self.stale = False
+
+    @property
+    def v_count(self) -> int:
+        return len(self.forward[0]) if self.forward else 0
+
+    @classmethod
+    def build(cls, csr, rcsr, k=16, landmarks=None, seed=0) -> 'LandmarkIndex':
+        """
+        Runs a forward sweep (over csr) and a backward sweep (over its reverse rcsr) from each landmark. Uses the
+        given landmark vertices, or picks k of them: the first at random (seeded), then repeatedly the vertex
+        farthest from all landmarks so far, counting only vertices they reach.
+        """
+        n = csr.v_count
+        forward, backward = [], []
+        chosen = list(landmarks) if landmarks is not None else []
+        if landmarks is None and n:
+            chosen.append(random.Random(seed).randrange(n))
+        closest = [INFINITY] * n  # distance from the nearest landmark, for the farthest-first choice
+
+        i = 0
+        while i < len(chosen):
+            forward.append(_sweep(csr, chosen[i]))
+            backward.append(_sweep(rcsr, chosen[i]))
+            if landmarks is None and len(chosen) < min(k, n):
+                far, far_v = -1, None
+                for v, d in enumerate(forward[-1]):
+                    if d < closest[v]:
+                        closest[v] = d
+                    if closest[v] != INFINITY and closest[v] > far:
+                        far, far_v = closest[v], v
+                if far_v is None or far <= 0:  # every reached vertex is a landmark - fall back to a random one
+                    rest = sorted(set(range(n)) - set(chosen))
+                    far_v = random.Random(seed + len(chosen)).choice(rest) if rest else None
+                if far_v is not None:
+                    chosen.append(far_v)
+            i += 1
+
+        return cls(chosen, forward, backward, csr.e_count)
+
+    def rebuild(self, csr, rcsr) -> None:
+        """
+        Recomputes the sweeps of the same landmarks on the current graph
+        """
+        kept = [v for v in self.landmarks if v < csr.v_count]
+        if len(kept) < len(self.landmarks):  # the graph shrank - pick a new set of the same size
+            fresh = LandmarkIndex.build(csr, rcsr, k=len(self.landmarks))
+        else:
+            fresh = LandmarkIndex.build(csr, rcsr, landmarks=kept)
+        self.landmarks, self.forward, self.backward, self.e_count = (fresh.landmarks, fresh.forward,
+                                                                     fresh.backward, fresh.e_count)
+        self.stale = False
+
+    def heuristic(self, src: int, dst: int, active=4):
+        """
+        Returns h(v), a lower bound on d(v, dst) (INFINITY if v provably cannot reach dst). Only the active
+        landmarks that give the largest bound at src are consulted, which keeps h cheap for large k.
+        """
+        terms = [(fwd, fwd[dst], bwd, bwd[dst]) for fwd, bwd in zip(self.forward, self.backward)]
+        if len(terms) > active:
+            terms.sort(key=lambda term: _bound([term], src), reverse=True)
+            terms = terms[:active]
+        return lambda v: _bound(terms, v)
+
+    # mutation observer interface (see DirectedGraph.add_observer())
+
+    def edge_changed(self, graph, src: int, dst: int, old_weight, new_weight) -> None:
+        """
+        Marks the index stale if the change to edge src -> dst can change a landmark distance. O(k).
+        """
+        if self.stale:
+            return
+        for fwd, bwd in zip(self.forward, self.backward):
+            if new_weight == 0 or (old_weight and new_weight > old_weight):  # removed or heavier
+                # only matters if the edge is tight, i.e. may lie on a shortest path to or from the landmark
+                if (fwd[dst] != INFINITY and fwd[src] + old_weight == fwd[dst] or
+                        bwd[src] != INFINITY and old_weight + bwd[dst] == bwd[src]):
+                    self.stale = True
+                    return
+            elif fwd[src] + new_weight < fwd[dst] or new_weight + bwd[dst] < bwd[src]:  # creates a shortcut
+                self.stale = True
+                return
+        self.e_count += (new_weight != 0) - (old_weight != 0)
+
+    def vertex_added(self, graph) -> None:
+        """
+        The new vertex has no edges, so it is unreachable from and to every landmark
+        """
+        if self.forward and not isinstance(self.forward[0], array):  # mapped from a file - copy before growing
+            self.forward = [array('d', column) for column in self.forward]
+            self.backward = [array('d', column) for column in self.backward]
+        for column in self.forward + self.backward:
+            column.append(INFINITY)
+
+    def graph_replaced(self, graph) -> None:
+        self.stale = True
+
+    # persistence
+
+    def save(self, path) -> None:
+        """
+        Writes the index to path: a header, the landmark ids (int64), then every forward and backward column
+        (little-endian doubles)
+        """
+        if sys.byteorder != 'little':
+            raise ValueError('the landmark index format is little-endian')
+        with open(path, 'wb') as out:
+            out.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(self.landmarks), self.v_count, self.e_count))
+            out.write(array('q', self.landmarks).tobytes())
+            for column in self.forward + self.backward:
+                out.write(memoryview(column).cast('B'))
+
+    @classmethod
+    def load(cls, path, use_mmap=True) -> 'LandmarkIndex':
+        """
+        Reads an index written by save(). With use_mmap the columns are read-only memoryviews into the mapped file,
+        copied into memory only if a vertex is added.
+        """
+        with open(path, 'rb') as f:
+            if use_mmap:
+                buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                buf = memoryview(f.read())
+        magic, version, k, v_count, e_count = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not a landmark index file')
+        if version != _FORMAT_VERSION:
+            raise ValueError(f'{path} has unsupported landmark index format version {version}')
+
+        offset = _HEADER.size
+        landmarks = buf[offset:offset + 8 * k].cast('q').tolist()
+        offset += 8 * k
+        columns = []
+        for _ in range(2 * k):
+            column = buf[offset:offset + 8 * v_count]
+            if use_mmap:
+                columns.append(column.cast('d'))
+            else:
+                columns.append(array('d'))
+                columns[-1].frombytes(column)
+            offset += 8 * v_count
+        return cls(landmarks, columns[:k], columns[k:], e_count)
+
+
+def _sweep(csr, landmark: int) -> array:
+    """
+    Dijkstra distances from landmark over csr as a column of doubles (INFINITY where unreachable)
+    """
+    column = array('d', [INFINITY]) * csr.v_count
+    dist, _ = dijkstra_search(csr, landmark)
+    for v, d in dist.items():
+        column[v] = d
+    return column
+
+
+def _bound(terms: [], v: int):
+    """
+    Largest triangle-inequality lower bound on d(v, t) over the (d(L, .), d(L, t), d(., L), d(t, L)) terms
+    """
+    bound = 0
+    for fwd, to_dst, bwd, from_dst in terms:
+        from_landmark = fwd[v]
+        if from_landmark != INFINITY and to_dst - from_landmark > bound:  # d(L, t) - d(L, v)
+            bound = to_dst - from_landmark
+        if from_dst != INFINITY and bwd[v] - from_dst > bound:  # d(v, L) - d(t, L)
+            bound = bwd[v] - from_dst
+    return bound
@@ -0,0 +1,305 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Multi-process graph computations over a shared, memory-mapped CSR graph
+
+
+import mmap
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from graph_io import load_csr, save_csr
+from graph_storage import CSRGraph
+from shortest_paths import INFINITY, dijkstra_search
+
+_SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None  # RAM-backed tmpfs where available
+_shared = None  # CSRGraph attached by each worker process
+_reverse = None  # reversed CSRGraph attached by each BFS worker
+_state = None  # BFSState attached by each BFS worker
+
+
+class SharedCSR:
+    """
+    Read-only copy of a CSRGraph in a temporary graph file (see graph_io.save_csr). Worker processes memory-map
+    the file instead of receiving pickled copies of the graph, so all of them share one copy through the page cache.
+    Use as a context manager; the file is removed on exit (mappings that are still open stay valid).
+    """
+
+    def __init__(self, csr: CSRGraph):
+        fd, self.path = tempfile.mkstemp(prefix='csr-', suffix='.bin', dir=_SHM_DIR)
+        os.close(fd)
+        save_csr(self.path, csr, directed=True)
+        self.layout = self.path
+
+    def __enter__(self) -> 'SharedCSR':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Removes the backing file
+        """
+        if self.path is not None:
+            os.unlink(self.path)
+            self.path = None
+
+    @staticmethod
+    def attach(layout) -> CSRGraph:
+        """
+        Maps a shared CSR file read-only and returns a CSRGraph whose columns are views into the mapping (zero copy)
+        """
+        csr, _, _ = load_csr(layout)
+        return csr
+
+
+def _attach_worker(layout) -> None:
+    """
+    Process pool initializer - maps the shared graph once per worker
+    """
+    global _shared
+    _shared = SharedCSR.attach(layout)
+
+
+def _encode_row(csr, src: int) -> bytes:
+    """
+    Runs Dijkstra from src and packs the distance row. Integer rows use -1 for INFINITY.
+    """
+    dist, _ = dijkstra_search(csr, src)
+    if csr.weight_code == 'd':
+        row = array('d', [INFINITY]) * csr.v_count
+    else:
+        row = array('q', [-1]) * csr.v_count
+    for v, d in dist.items():
+        row[v] = d
+    return row.tobytes()
+
+
+def _dijkstra_row(csr, src: int) -> []:
+    """
+    Runs Dijkstra from src in this process and returns the row in the DirectedGraph.dijkstra() format
+    """
+    dist, _ = dijkstra_search(csr, src)
+    row = [INFINITY] * csr.v_count
+    for v, d in dist.items():
+        row[v] = d
+    return row
+
+
+def _decode_row(data: bytes, weight_code: str) -> []:
+    """
+    Unpacks a distance row into the list format returned by DirectedGraph.dijkstra()
+    """
+    if weight_code == 'd':
+        return array('d', data).tolist()
+    return [INFINITY if d < 0 else d for d in array('q', data)]
+
+
+def _worker_rows(sources: []) -> []:
+    return [_encode_row(_shared, src) for src in sources]
+
+
+def iter_dijkstra_many(csr: CSRGraph, sources, workers=None, chunk_size=16):
+    """
+    Yields one Dijkstra distance row per source, in source order, computed by a pool of worker processes that
+    share csr through a memory-mapped file. Chunks of chunk_size sources are handed out as workers free up, so
+    rows are streamed back without materializing the whole matrix. Graphs whose weights mix types (a list weight
+    column, which the shared file format cannot hold exactly) are computed in this process.
+    """
+    sources = list(sources)
+    workers = workers or os.cpu_count() or 1
+    weight_code = 'd' if csr.weight_code == 'd' else 'q'
+
+    if csr.weight_code == 'O':
+        for src in sources:
+            yield _dijkstra_row(csr, src)
+        return
+    if workers == 1 or len(sources) <= 1:  # not worth starting processes
+        for src in sources:
+            yield _decode_row(_encode_row(csr, src), weight_code)
+        return
+
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+    with SharedCSR(csr) as shared:
+        with ProcessPoolExecutor(workers, initializer=_attach_worker, initargs=(shared.layout,)) as pool:
+            for rows in pool.map(_worker_rows, chunks):
+                for data in rows:
+                    yield _decode_row(data, weight_code)
+
+
+class BFSState:
+    """
+    Hop counts and the current frontier of a parallel BFS, in a temporary file that the coordinating process maps
+    read-write and BFS workers map read-only. Each column is an array of V signed 64-bit values; -1 hops means not
+    reached yet.
+    """
+
+    def __init__(self, v_count: int, path=None):
+        """
+        Creates the file (or, given path, maps an existing one read-only)
+        """
+        self.owner = path is None
+        if self.owner:
+            fd, path = tempfile.mkstemp(prefix='bfs-', suffix='.bin', dir=_SHM_DIR)
+            os.ftruncate(fd, max(16 * v_count, 16))
+            os.close(fd)
+        self.path = path
+        with open(path, 'r+b' if self.owner else 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if self.owner else mmap.ACCESS_READ)
+        words = memoryview(self._map).cast('q')
+        self.hops = words[:v_count]
+        self.frontier = words[v_count:2 * v_count]
+
+    def close(self) -> None:
+        """
+        Unmaps the file, and removes it if this process created it
+        """
+        self.hops.release()
+        self.frontier.release()
+        self._map.close()
+        if self.owner:
+            os.unlink(self.path)
+
+
+def _attach_bfs_worker(layout, reverse_layout, state_path, v_count: int) -> None:
+    """
+    Process pool initializer - maps the shared graph, its reverse and the BFS state once per worker
+    """
+    global _shared, _reverse, _state
+    _shared = SharedCSR.attach(layout)
+    _reverse = SharedCSR.attach(reverse_layout)
+    _state = BFSState(v_count, state_path)
+
+
+def _top_down(csr, hops, frontier, lo: int, hi: int) -> array:
+    """
+    Expands frontier[lo:hi] (ascending) and returns the newly reached vertices as flat (vertex, parent) pairs,
+    each with the smallest parent in this slice
+    """
+    found = dict()
+    for i in range(lo, hi):
+        u = frontier[i]
+        for v in csr.neighbors(u):
+            if hops[v] < 0 and v not in found:
+                found[v] = u
+    pairs = array('q')
+    for v, u in found.items():
+        pairs.append(v)
+        pairs.append(u)
+    return pairs
+
+
+def _bottom_up(rcsr, hops, level: int, lo: int, hi: int) -> array:
+    """
+    Checks each unreached vertex in [lo, hi) for an in-neighbor on the frontier (hop count == level). In-neighbors
+    are scanned in ascending order, so the first hit is the smallest parent. Returns flat (vertex, parent) pairs.
+    """
+    pairs = array('q')
+    for v in range(lo, hi):
+        if hops[v] < 0:
+            for u in rcsr.neighbors(v):
+                if hops[u] == level:
+                    pairs.append(v)
+                    pairs.append(u)
+                    break
+    return pairs
+
+
+def _bfs_step(csr, rcsr, state: BFSState, task: ()) -> array:
+    """
+    Runs one chunk of a BFS level: (bottom_up, level, lo, hi)
+    """
+    bottom_up, level, lo, hi = task
+    if bottom_up:
+        return _bottom_up(rcsr, state.hops, level, lo, hi)
+    return _top_down(csr, state.hops, state.frontier, lo, hi)
+
+
+def _worker_bfs_step(task: ()) -> bytes:
+    return _bfs_step(_shared, _reverse, _state, task).tobytes()
+
+
+def _bfs_levels(csr, src: int, state: BFSState, run_chunks, workers: int, alpha, beta) -> (array, array):
+    """
+    Coordinates parallel_bfs(): picks the direction of each level, splits it into chunks, has run_chunks(tasks)
+    compute them, and merges the proposed (vertex, parent) pairs into the hop counts and parents
+    """
+    n = csr.v_count
+    parents = array('q', [-1]) * n
+    hops, frontier = state.hops, state.frontier
+    hops[:] = parents  # every vertex starts unreached
+    hops[src] = 0
+    parents[src] = src
+    frontier[0] = src
+    size = 1  # the frontier occupies frontier[:size], in ascending order
+    unexplored = csr.e_count - csr.degree(src)  # out-edges of the vertices not reached yet
+    bottom_up = False
+    level = 0
+
+    while size:
+        frontier_edges = sum(csr.degree(frontier[i]) for i in range(size))
+        if not bottom_up and frontier_edges > unexplored / alpha:
+            bottom_up = True
+        elif bottom_up and size < n / beta:
+            bottom_up = False
+
+        span = n if bottom_up else size  # vertices (bottom-up) or frontier entries (top-down) to split up
+        step = -(-span // (4 * workers))  # about four chunks per worker
+        tasks = [(bottom_up, level, lo, min(lo + step, span)) for lo in range(0, span, step)]
+
+        reached = []
+        for pairs in run_chunks(tasks):  # keep the smallest parent proposed for each vertex
+            for i in range(0, len(pairs), 2):
+                v, u = pairs[i], pairs[i + 1]
+                if hops[v] < 0:
+                    hops[v] = level + 1
+                    parents[v] = u
+                    reached.append(v)
+                elif u < parents[v]:
+                    parents[v] = u
+        reached.sort()
+        size = len(reached)
+        frontier[:size] = array('q', reached)
+        unexplored -= sum(csr.degree(v) for v in reached)
+        level += 1
+
+    return array('q', hops), parents
+
+
+def parallel_bfs(csr: CSRGraph, src: int, workers=None, rcsr=None, alpha=14, beta=24) -> (array, array):
+    """
+    Level-synchronous, direction-optimizing BFS from src. Returns (hops, parents) arrays indexed by vertex: the
+    number of edges on a shortest path from src (-1 if unreachable) and the BFS tree parent (src for src itself,
+    -1 if unreachable).
+    - each level is split into chunks that a pool of worker processes expands in parallel; the workers map the
+      graph, its reverse and the hop counts from shared files instead of receiving copies
+    - levels run top-down (expand the frontier's out-edges) while the frontier is small, and switch to bottom-up
+      (every unreached vertex looks for a parent among its in-edges) once the frontier's out-edges outnumber the
+      unexplored edges / alpha, until the frontier shrinks below V / beta (Beamer et al.)
+    - a vertex's parent is always its smallest in-neighbor on the previous level, so the result is deterministic
+      and independent of the number of workers and of the direction chosen for each level
+    Rows of csr and rcsr must be sorted by id. rcsr defaults to csr.transpose(); pass csr itself for undirected
+    (symmetric) graphs. With workers=1 the same levels run in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    rcsr = csr.transpose() if rcsr is None else rcsr
+    state = BFSState(csr.v_count)
+    try:
+        if workers == 1:  # not worth starting processes
+            def run_chunks(tasks):
+                return [_bfs_step(csr, rcsr, state, task) for task in tasks]
+            return _bfs_levels(csr, src, state, run_chunks, workers, alpha, beta)
+
+        structure = CSRGraph(csr.v_count, csr.offsets, csr.targets, None)  # BFS ignores weights - share no copy
+        reverse_structure = CSRGraph(rcsr.v_count, rcsr.offsets, rcsr.targets, None)
+        with SharedCSR(structure) as shared, SharedCSR(reverse_structure) as reverse:
+            initargs = (shared.layout, reverse.layout, state.path, csr.v_count)
+            with ProcessPoolExecutor(workers, initializer=_attach_bfs_worker, initargs=initargs) as pool:
+                def run_chunks(tasks):
+                    return [array('q', data) for data in pool.map(_worker_bfs_step, tasks)]
+                return _bfs_levels(csr, src, state, run_chunks, workers, alpha, beta)
+    finally:
+        state.close()
@@ -0,0 +1,158 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Size-bounded LRU cache of single-source shortest-path results for DirectedGraph
+
+
+import sys
+from array import array
+from collections import OrderedDict
+
+from shortest_paths import INFINITY
+
+
+class _Entry:
+    """
+    One cached dijkstra() result: the distance list plus the shortest-path tree that produced it (pred[v] is the
+    parent of v, -1 for the source and unreached vertices), valid for one graph version
+    """
+
+    __slots__ = ('version', 'dist', 'pred', 'size')
+
+    def __init__(self, version: int, dist: [], pred: array):
+        self.version = version
+        self.dist = dist
+        self.pred = pred
+        # approximate footprint in bytes: the list only holds references, so each distance object counts too
+        self.size = sys.getsizeof(dist) + sum(map(sys.getsizeof, dist)) + pred.itemsize * len(pred)
+
+
+class ShortestPathCache:
+    """
+    LRU cache of DirectedGraph.dijkstra(src) results keyed on (src, graph version)
+    - bounded by max_entries sources and, optionally, max_bytes of cached distance lists and trees
+    - attached to a graph as a mutation observer (see DirectedGraph.cache_shortest_paths()), so an entry survives
+      edits that cannot change its distances instead of expiring on every version bump:
+        - a removed or heavier edge only invalidates entries whose shortest-path tree uses that edge
+        - a new or lighter edge u -> v only invalidates entries where it shortens the path to v
+        - a new vertex is appended to every entry as unreachable
+    - hits, misses, evictions (capacity) and invalidations (mutations) are counted
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        """
+        Creates an empty cache holding at most max_entries sources and max_bytes bytes (no byte limit if None)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self._entries = OrderedDict()  # src -> _Entry, least recently used first
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, src) -> bool:
+        return src in self._entries
+
+    def stats(self) -> {}:
+        """
+        Returns the counters as a dict
+        """
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'invalidations': self.invalidations}
+
+    def clear(self) -> None:
+        """
+        Drops every entry (counted as invalidations)
+        """
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+
+    def get(self, src: int, version: int):
+        """
+        Returns the cached distance list for src at this graph version, or None on a miss
+        """
+        entry = self._entries.get(src)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(src)
+        self.hits += 1
+        return entry.dist
+
+    def put(self, src: int, version: int, dist: [], pred: {}) -> None:
+        """
+        Caches the result of a full Dijkstra search from src: dist is the dijkstra() list and pred the
+        predecessor dict of the search. Evicts least recently used entries until the cache is within its limits.
+        """
+        tree = array('q', [-1]) * len(dist)
+        for v, u in pred.items():
+            if u is not None:
+                tree[v] = u
+        self._drop(src)
+        entry = self._entries[src] = _Entry(version, dist, tree)
+        self.bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, lru = self._entries.popitem(last=False)
+            self.bytes -= lru.size
+            self.evictions += 1
+
+    def _drop(self, src: int) -> None:
+        entry = self._entries.pop(src, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def _invalidate(self, src: int) -> None:
+        self._drop(src)
+        self.invalidations += 1
+
+    # mutation observer interface (see DirectedGraph.add_observer())
+
+    def edge_changed(self, graph, src: int, dst: int, old_weight, new_weight) -> None:
+        """
+        Keeps each entry whose distances cannot be affected by the change to edge src -> dst and moves it to the
+        new version; invalidates the rest. O(1) per entry.
+        """
+        version = graph.version
+        for key, entry in list(self._entries.items()):
+            if entry.version != version - 1:  # missed an earlier change
+                self._invalidate(key)
+            elif new_weight == 0 or (old_weight and new_weight > old_weight):  # edge removed or heavier
+                if entry.pred[dst] == src:  # it is a tree edge, so dst (and maybe its subtree) may get farther
+                    self._invalidate(key)
+                else:
+                    entry.version = version
+            else:  # edge added or lighter
+                d = entry.dist[src]
+                if d != INFINITY and d + new_weight < entry.dist[dst]:  # it creates a shorter path to dst
+                    self._invalidate(key)
+                else:
+                    entry.version = version
+
+    def vertex_added(self, graph) -> None:
+        """
+        Extends every current entry with the new, unreachable vertex
+        """
+        version = graph.version
+        for key, entry in list(self._entries.items()):
+            if entry.version != version - 1:
+                self._invalidate(key)
+                continue
+            entry.dist.append(INFINITY)
+            entry.pred.append(-1)
+            entry.version = version
+            grown = sys.getsizeof(INFINITY) + entry.pred.itemsize
+            entry.size += grown
+            self.bytes += grown
+
+    def graph_replaced(self, graph) -> None:
+        """
+        Bulk changes (add_edges_from(), a new adj_matrix or storage backend) invalidate everything
+        """
+        self.clear()
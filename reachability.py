@@ -0,0 +1,267 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Reachability index answering repeated "can u reach v" queries on a DirectedGraph
+
+
+import heapq as heap
+from array import array
+
+from traversal import strongly_connected
+
+
+class ReachabilityIndex:
+    """
+    Reachability labels of a DirectedGraph for answering many "is there a path from u to v" queries
+    - strongly connected components are condensed (iterative Tarjan), so vertices of one component reach each
+      other and the rest of the index works on the condensed DAG
+    - order ranks the components in reverse topological order (every arc goes from a higher rank to a lower one),
+      so u cannot reach v if order[comp[u]] < order[comp[v]]. It starts as Tarjan's numbering; an edge against it
+      only reorders the components between its endpoints (Pearce-Kelly).
+    - hashed labels (a Bloom filter of bits bits per component, stored as an int): out_hash[c] has a bit for every
+      component c reaches and in_hash[c] one for every component reaching c. If u reaches v, everything v reaches
+      u reaches too, so a bit of out_hash[v] missing from out_hash[u] (or of in_hash[u] from in_hash[v]) proves v
+      is unreachable.
+    - hub labels (a partial 2-hop cover): the hubs components with the most paths through them get one bit each;
+      out_hubs[c] marks the hubs c reaches and in_hubs[c] the hubs reaching c, so a common hub proves a path.
+    - queries the labels cannot settle fall back to a DFS of the condensed DAG pruned by the same labels, so
+      answers are always exact; most queries cost O(1)
+    - attached to the graph as a mutation observer and maintained in place, touching only the components whose
+      labels change: new vertices, new edges that keep the condensation acyclic (widening the labels), and removed
+      edges between components (recomputing the labels above and below the removed arc in rank order).
+      Reweighting never matters. Only edits that merge or may split a strongly connected component (a new edge
+      closing a cycle, or a removed edge inside a component) mark the index stale; the graph then rebuilds it
+      before the next query, at the cost of the initial build (O(V + E) time, plus the labels' memory).
+    - memory is about (bits + hubs) / 4 bytes per component, plus the condensed DAG
+    """
+
+    def __init__(self, comp: array, count: int, dag: [], edges: {}, bits=1024, hubs=256):
+        """
+        Labels the condensation given by comp (component of each vertex, in reverse topological order), count
+        components, dag (sorted successor components of each component) and edges ({(cu, cv): number of graph
+        edges from component cu to cv}), with bits-bit hashed labels and hubs hub labels
+        """
+        self.comp = comp
+        self.count = count
+        self.bits = bits
+        self.hubs = hubs
+        self.stale = False
+        self._dag = dag
+        self._edges = edges
+        self._order = array('q', range(count))
+        self._preds = [[] for _ in range(count)]  # predecessor components of each component
+        for cu, cv in sorted(edges):
+            self._preds[cv].append(cu)
+
+        ranked = sorted(range(count), key=lambda c: (len(dag[c]) + 1) * (len(self._preds[c]) + 1), reverse=True)
+        hub_bit = self._hub_bit = dict()  # component -> its bit in the hub labels
+        for i, c in enumerate(ranked[:hubs]):
+            hub_bit[c] = 1 << i
+
+        self._out_hash, self._out_hubs = [0] * count, [0] * count
+        for c in range(count):  # successors have lower numbers, so their labels are final
+            out_hash, out_hubs = 1 << (c % bits), hub_bit.get(c, 0)
+            for s in dag[c]:
+                out_hash |= self._out_hash[s]
+                out_hubs |= self._out_hubs[s]
+            self._out_hash[c], self._out_hubs[c] = out_hash, out_hubs
+
+        self._in_hash, self._in_hubs = [0] * count, [0] * count
+        for c in range(count - 1, -1, -1):  # predecessors have higher numbers
+            in_hash, in_hubs = 1 << (c % bits), hub_bit.get(c, 0)
+            for p in self._preds[c]:
+                in_hash |= self._in_hash[p]
+                in_hubs |= self._in_hubs[p]
+            self._in_hash[c], self._in_hubs[c] = in_hash, in_hubs
+
+    @classmethod
+    def build(cls, csr, bits=1024, hubs=256) -> 'ReachabilityIndex':
+        """
+        Condenses the graph in csr and labels the resulting DAG. O(V + E).
+        """
+        comp, count = strongly_connected(csr.v_count, csr.neighbors)
+        edges = dict()
+        for u in range(csr.v_count):
+            cu = comp[u]
+            for v in csr.neighbors(u):
+                cv = comp[v]
+                if cu != cv:
+                    edges[(cu, cv)] = edges.get((cu, cv), 0) + 1
+        dag = [[] for _ in range(count)]
+        for cu, cv in sorted(edges):
+            dag[cu].append(cv)
+        return cls(comp, count, dag, edges, bits, hubs)
+
+    def rebuild(self, csr) -> None:
+        """
+        Recomputes the index from the current graph, with the same label sizes
+        """
+        self.__dict__.update(ReachabilityIndex.build(csr, self.bits, self.hubs).__dict__)
+
+    def reachable(self, u: int, v: int) -> bool:
+        """
+        Returns True if there is a path from vertex u to vertex v (every vertex reaches itself)
+        """
+        cu, cv = self.comp[u], self.comp[v]
+        if cu == cv:
+            return True
+        if self._order[cu] < self._order[cv]:  # v's component comes earlier in topological order
+            return False
+        out_hash, in_hash = self._out_hash, self._in_hash
+        if out_hash[cv] & ~out_hash[cu] or in_hash[cu] & ~in_hash[cv]:
+            return False
+        if self._out_hubs[cu] & self._in_hubs[cv]:  # a path through a common hub
+            return True
+        return self._search(cu, cv)
+
+    def _search(self, cu: int, cv: int) -> bool:
+        """
+        DFS of the condensed DAG from cu towards cv, skipping every component the labels rule out
+        """
+        order, out_hash, in_hash, out_hubs = self._order, self._out_hash, self._in_hash, self._out_hubs
+        rank = order[cv]
+        target_out, target_in, target_hubs = out_hash[cv], in_hash[cv], self._in_hubs[cv]
+        seen = {cu}
+        stack = [cu]
+        while len(stack) != 0:
+            for c in self._dag[stack.pop()]:
+                if c == cv:
+                    return True
+                if order[c] < rank or c in seen or target_out & ~out_hash[c] or in_hash[c] & ~target_in:
+                    continue
+                if out_hubs[c] & target_hubs:
+                    return True
+                seen.add(c)
+                stack.append(c)
+        return False
+
+    def _add_arc(self, cu: int, cv: int) -> None:
+        """
+        Adds the DAG arc cu -> cv (order[cu] > order[cv]) and widens the labels it affects: the out labels of cu and its
+        ancestors, and the in labels of cv and its descendants
+        """
+        self._dag[cu].append(cv)
+        self._preds[cv].append(cu)
+        for hashed, hubs, step, c, other in ((self._out_hash, self._out_hubs, self._preds, cu, cv),
+                                             (self._in_hash, self._in_hubs, self._dag, cv, cu)):
+            new_hash, new_hubs = hashed[other], hubs[other]
+            stack = [c]
+            while len(stack) != 0:
+                c = stack.pop()
+                if hashed[c] | new_hash == hashed[c] and hubs[c] | new_hubs == hubs[c]:
+                    continue  # already covered, and so is everything past it
+                hashed[c] |= new_hash
+                hubs[c] |= new_hubs
+                stack.extend(step[c])
+
+    def _remove_arc(self, cu: int, cv: int) -> None:
+        """
+        Removes the DAG arc cu -> cv and recomputes the labels it may have contributed to: the out labels of cu and
+        its ancestors (lowest rank first, so successors are final) and the in labels of cv and its descendants
+        (highest rank first). Propagation stops wherever a label comes out unchanged.
+        """
+        self._dag[cu].remove(cv)
+        self._preds[cv].remove(cu)
+        self._refresh(cu, self._out_hash, self._out_hubs, self._dag, self._preds, 1)
+        self._refresh(cv, self._in_hash, self._in_hubs, self._preds, self._dag, -1)
+
+    def _refresh(self, start: int, hashed: [], hubs: [], inputs: [], outputs: [], sign: int) -> None:
+        """
+        Recomputes hashed[c] and hubs[c] as the component's own bits plus the labels of its inputs, for start and,
+        while labels keep changing, the components it feeds (outputs), in ascending sign * rank order
+        """
+        order = self._order
+        pending = [(sign * order[start], start)]
+        queued = {start}
+        while len(pending) != 0:
+            _, c = heap.heappop(pending)
+            queued.discard(c)
+            new_hash, new_hubs = 1 << (c % self.bits), self._hub_bit.get(c, 0)
+            for i in inputs[c]:
+                new_hash |= hashed[i]
+                new_hubs |= hubs[i]
+            if new_hash == hashed[c] and new_hubs == hubs[c]:
+                continue  # unchanged, so nothing past it changes either
+            hashed[c], hubs[c] = new_hash, new_hubs
+            for o in outputs[c]:
+                if o not in queued:
+                    queued.add(o)
+                    heap.heappush(pending, (sign * order[o], o))
+
+    def _reorder(self, cu: int, cv: int) -> bool:
+        """
+        Makes room for a new arc cu -> cv against the order (order[cu] < order[cv]) by ranking cv's descendants
+        below cu's ancestors, touching only components ranked between the two. Returns False, changing nothing,
+        if cv reaches cu, i.e. the arc would close a cycle.
+        """
+        order = self._order
+        low, high = order[cu], order[cv]
+        groups = []
+        for start, step, inside in ((cv, self._dag, lambda c: order[c] > low),
+                                    (cu, self._preds, lambda c: order[c] < high)):
+            found = [start]
+            seen = {start}
+            i = 0
+            while i < len(found):
+                for c in step[found[i]]:
+                    if c == cu:  # cv reaches cu
+                        return False
+                    if c not in seen and inside(c):
+                        seen.add(c)
+                        found.append(c)
+                i += 1
+            groups.append(sorted(found, key=order.__getitem__))
+        moved = groups[0] + groups[1]  # descendants of cv, then ancestors of cu, each in their old order
+        for c, rank in zip(moved, sorted(order[c] for c in moved)):
+            order[c] = rank
+        return True
+
+    # mutation observer interface (see DirectedGraph.add_observer())
+
+    def edge_changed(self, graph, src: int, dst: int, old_weight, new_weight) -> None:
+        """
+        Applies the change to edge src -> dst in place, or marks the index stale if it merges or may split a
+        strongly connected component
+        """
+        if self.stale or (old_weight and new_weight):  # reweighting never changes reachability
+            return
+        cu, cv = self.comp[src], self.comp[dst]
+        key = (cu, cv)
+
+        if new_weight == 0:  # removed
+            if cu == cv:  # may split the component
+                self.stale = True
+            elif self._edges[key] > 1:  # another edge still joins the two components
+                self._edges[key] -= 1
+            else:  # the last edge of the arc
+                del self._edges[key]
+                self._remove_arc(cu, cv)
+            return
+
+        if cu == cv:
+            return
+        if key in self._edges:  # another edge already joins the two components
+            self._edges[key] += 1
+        elif self._order[cu] > self._order[cv] or self._reorder(cu, cv):  # the condensation stays acyclic
+            self._edges[key] = 1
+            self._add_arc(cu, cv)
+        else:
+            self.stale = True
+
+    def vertex_added(self, graph) -> None:
+        """
+        Gives the new vertex a component of its own, ranked above every other one
+        """
+        c = self.count
+        self.comp.append(c)
+        self._order.append(c)
+        self.count += 1
+        self._dag.append([])
+        self._preds.append([])
+        for hashed in (self._out_hash, self._in_hash):
+            hashed.append(1 << (c % self.bits))
+        for hubs in (self._out_hubs, self._in_hubs):
+            hubs.append(0)
+
+    def graph_replaced(self, graph) -> None:
+        self.stale = True
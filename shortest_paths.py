@@ -0,0 +1,151 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Dijkstra variants over CSR graphs (single-source, early exit, bounded radius, bidirectional, A*)
+
+
+import heapq as heap
+
+INFINITY = float('inf')
+
+
+def dijkstra_search(csr, src: int, target=None, max_distance=None, stats=None) -> ({}, {}):
+    """
+    Lazy-deletion Dijkstra from src over a CSRGraph (no decrease-key: stale heap entries are skipped when popped).
+    Stops as soon as target is settled, and never expands past max_distance.
+    Returns (dist, pred) dicts for every vertex reached; pred[src] is None. Only the distances of settled
+    vertices are final when the search stops early.
+    stats, if given, is an instrumentation.TraversalStats to count the work (and heap operations) in.
+    """
+    dist = {src: 0}  # best known distance to each reached vertex
+    pred = {src: None}  # predecessor on the best known path
+    pq = [(0, src)]  # priority queue - (distance, vertex)
+
+    popped = 0 if stats is None else stats.heap_pops
+    while len(pq) > 0:
+        if stats is not None:
+            stats.pop(len(pq))
+        d, v = heap.heappop(pq)
+        if d > dist[v]:  # stale entry, v was already settled with a shorter distance
+            continue
+        if v == target:  # target settled - its distance is final
+            break
+        if stats is not None:
+            stats.expand(len(pq), csr.degree(v))
+        for u, w in csr.out_edges(v):  # relax the out-edges of v
+            du = d + w
+            if du < dist.get(u, INFINITY) and (max_distance is None or du <= max_distance):
+                dist[u] = du
+                pred[u] = v
+                heap.heappush(pq, (du, u))
+
+    if stats is not None:  # every entry pushed was either popped or is still queued
+        stats.heap_pushes += stats.heap_pops - popped + len(pq)
+    return dist, pred
+
+
+def bidirectional_search(csr, rcsr, src: int, dst: int, max_distance=None, stats=None) -> (float, []):
+    """
+    Point-to-point Dijkstra that grows a forward search from src over csr and a backward search from dst over
+    rcsr (the reversed graph) until the two frontiers prove the best meeting point is optimal.
+    Returns (distance, path), or (INFINITY, []) if dst is unreachable (or farther than max_distance).
+    stats counts the work of both searches as in dijkstra_search().
+    """
+    if src == dst:
+        return 0, [src]
+
+    dist = ({src: 0}, {dst: 0})  # forward / backward distances
+    pred = ({src: None}, {dst: None})  # forward predecessors / backward successors
+    pqs = ([(0, src)], [(0, dst)])
+    graphs = (csr, rcsr)
+    best, meet = INFINITY, None
+
+    popped = 0 if stats is None else stats.heap_pops
+    while len(pqs[0]) > 0 and len(pqs[1]) > 0:
+        if pqs[0][0][0] + pqs[1][0][0] >= best:  # no unsettled path can beat the best meeting point
+            break
+        side = 0 if pqs[0][0][0] <= pqs[1][0][0] else 1  # expand the side with the smaller frontier key
+        if stats is not None:
+            stats.pop(len(pqs[0]) + len(pqs[1]))
+        d, v = heap.heappop(pqs[side])
+        if d > dist[side][v]:
+            continue
+        if stats is not None:
+            stats.expand(len(pqs[0]) + len(pqs[1]), graphs[side].degree(v))
+        mine, other = dist[side], dist[1 - side]
+        for u, w in graphs[side].out_edges(v):
+            du = d + w
+            if du < mine.get(u, INFINITY) and (max_distance is None or du <= max_distance):
+                mine[u] = du
+                pred[side][u] = v
+                heap.heappush(pqs[side], (du, u))
+            if u in other and du + other[u] < best:  # the two searches meet at u
+                best, meet = du + other[u], u
+
+    if stats is not None:  # every entry pushed on either side was either popped or is still queued
+        stats.heap_pushes += stats.heap_pops - popped + len(pqs[0]) + len(pqs[1])
+    if meet is None or (max_distance is not None and best > max_distance):
+        return INFINITY, []
+
+    path = build_path(pred[0], meet)
+    v = pred[1][meet]
+    while v is not None:  # walk the backward tree from the meeting point to dst
+        path.append(v)
+        v = pred[1][v]
+    return best, path
+
+
+def astar_search(csr, src: int, dst: int, heuristic, max_distance=None, stats=None) -> (float, []):
+    """
+    Lazy-deletion A* from src to dst over a CSRGraph. heuristic(v) must be a consistent lower bound on the
+    distance from v to dst (INFINITY if v cannot reach dst, so it is never queued).
+    Returns (distance, path), or (INFINITY, []) if dst is unreachable (or farther than max_distance).
+    stats counts the work as in dijkstra_search().
+    """
+    if heuristic(src) == INFINITY:
+        return INFINITY, []
+    dist = {src: 0}
+    pred = {src: None}
+    pq = [(heuristic(src), 0, src)]  # priority queue - (distance + heuristic, distance, vertex)
+
+    popped = 0 if stats is None else stats.heap_pops
+    found = False
+    while len(pq) > 0:
+        if stats is not None:
+            stats.pop(len(pq))
+        _, d, v = heap.heappop(pq)
+        if d > dist[v]:  # stale entry
+            continue
+        if v == dst:
+            found = True
+            break
+        if stats is not None:
+            stats.expand(len(pq), csr.degree(v))
+        for u, w in csr.out_edges(v):
+            du = d + w
+            if du < dist.get(u, INFINITY) and (max_distance is None or du <= max_distance):
+                h = heuristic(u)
+                if h == INFINITY:  # u provably cannot reach dst
+                    continue
+                dist[u] = du
+                pred[u] = v
+                heap.heappush(pq, (du + h, du, u))
+
+    if stats is not None:
+        stats.heap_pushes += stats.heap_pops - popped + len(pq)
+    if not found:
+        return INFINITY, []
+    return dist[dst], build_path(pred, dst)
+
+
+def build_path(pred: {}, dst: int) -> []:
+    """
+    Follows predecessor links back from dst to the search source and returns the path source -> dst
+    """
+    path = []
+    v = dst
+    while v is not None:
+        path.append(v)
+        v = pred[v]
+    path.reverse()
+    return path
@@ -0,0 +1,172 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Immutable point-in-time read views of the graph classes, for serving queries from many threads
+
+
+from graph_storage import pack_paths
+from shortest_paths import INFINITY, bidirectional_search, build_path, dijkstra_search
+from traversal import iter_bfs, iter_dfs
+
+
+class GraphSnapshot:
+    """
+    Immutable, compact read view of a graph as of one version
+    - holds the graph's CSR arrays, which are never modified once built, plus the vertex names of an
+      UndirectedGraph
+    - any number of threads can query one snapshot without locks, and later mutations of the graph never reach it
+    - published by DirectedGraph.snapshot() / UndirectedGraph.snapshot()
+    """
+
+    def __init__(self, csr, version: int, directed: bool, names=None, ids=None):
+        """
+        Wrap a CSR of vertex ids. names (id -> name) and ids (name -> id) are given for named vertices; without
+        them every vertex is its own id.
+        """
+        self.csr = csr
+        self.version = version
+        self.directed = directed
+        self._names = names
+        self._ids = ids
+        self._reverse = None  # reversed CSR, built on the first bidirectional search
+
+    @property
+    def v_count(self) -> int:
+        """
+        Returns the number of vertices in the snapshot
+        """
+        return self.csr.v_count if self._ids is None else len(self._ids)
+
+    def _id(self, v):
+        """
+        Returns the id of vertex v, or None if v is not in the snapshot
+        """
+        if self._ids is None:
+            return v if v in range(0, self.csr.v_count) else None
+        return self._ids.get(v)
+
+    def _name_of(self, ids):
+        """
+        Maps an iterable of ids back to vertex names (no-op for unnamed vertices)
+        """
+        return ids if self._names is None else map(self._names.__getitem__, ids)
+
+    def get_vertices(self) -> []:
+        """
+        Return list of vertices in the snapshot
+        """
+        return list(range(self.csr.v_count)) if self._ids is None else list(self._ids)
+
+    def neighbors(self, v) -> []:
+        """
+        Returns the (out-)neighbors of v in the order traversals visit them
+        """
+        i = self._id(v)
+        if i is None:
+            return []
+        return list(self._name_of(self.csr.neighbors(i)))
+
+    def iter_dfs(self, v_start, v_end=None):
+        """
+        Lazily yields the vertices visited during DFS search, exactly as the graph's dfs() did at this version
+        """
+        i = self._id(v_start)
+        if i is None:  # start vertex not in graph
+            return iter(())
+        return self._name_of(iter_dfs(i, self.csr.neighbors, self._id(v_end), self.csr.v_count))
+
+    def iter_bfs(self, v_start, v_end=None):
+        """
+        Lazily yields the vertices visited during BFS search, exactly as the graph's bfs() did at this version
+        """
+        i = self._id(v_start)
+        if i is None:  # start vertex not in graph
+            return iter(())
+        return self._name_of(iter_bfs(i, self.csr.neighbors, self._id(v_end), self.csr.v_count))
+
+    def dfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during DFS search
+        """
+        return list(self.iter_dfs(v_start, v_end))
+
+    def bfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during BFS search
+        """
+        return list(self.iter_bfs(v_start, v_end))
+
+    def validate_paths(self, paths, offsets=None, weights=False):
+        """
+        Batch path check with the same input and output as the graph's validate_paths()
+        """
+        if offsets is None:
+            paths, offsets = pack_paths(paths)
+        if self._ids is None:
+            valid, totals = self.csr.validate_paths(paths, offsets, weights)
+        else:
+            ids = self._ids
+            flat = [ids.get(v, -1) for v in paths]  # unknown vertices fail the bounds check
+            valid, totals = self.csr.validate_paths(flat, offsets, weights, key=self._names.__getitem__)
+            for p in range(len(valid)):  # a one-vertex path is only valid if the vertex exists
+                if offsets[p + 1] - offsets[p] == 1 and flat[offsets[p]] < 0:
+                    valid[p] = 0
+        return (valid, totals) if weights else valid
+
+    def is_valid_path(self, path: []) -> bool:
+        """
+        Return True if path is a valid path in the snapshot (see the graph's is_valid_path())
+        """
+        return bool(self.validate_paths([path])[0])
+
+    def shortest_path_tree(self, src, max_distance=None) -> ({}, {}):
+        """
+        Runs one full Dijkstra search from src and returns (dist, pred) dicts over the reached vertices, so the
+        shortest path to any of them can be read back with shortest_paths.build_path(pred, dst). Returns two empty
+        dicts if src is not in the snapshot.
+        """
+        i = self._id(src)
+        if i is None:
+            return dict(), dict()
+        dist, pred = dijkstra_search(self.csr, i, max_distance=max_distance)
+        if self._names is None:
+            return dist, pred
+        names = self._names
+        return ({names[v]: d for v, d in dist.items()},
+                {names[v]: None if u is None else names[u] for v, u in pred.items()})
+
+    def dijkstra(self, src, max_distance=None):
+        """
+        Shortest distances from src (INFINITY where unreachable or farther than max_distance). Unnamed snapshots
+        return a list indexed by vertex like DirectedGraph.dijkstra(); named ones return a {vertex: distance} dict,
+        counting every edge as length 1.
+        """
+        i = self._id(src)
+        dist = dict() if i is None else dijkstra_search(self.csr, i, max_distance=max_distance)[0]
+        if self._ids is None:
+            min_paths = [INFINITY] * self.csr.v_count
+            for v, d in dist.items():
+                min_paths[v] = d
+            return min_paths
+        return {v: dist.get(j, INFINITY) for v, j in self._ids.items()}
+
+    def shortest_path(self, src, dst, max_distance=None, bidirectional=False) -> (float, []):
+        """
+        Returns (distance, path) for the shortest path from src to dst, or (INFINITY, []) if there is none.
+        See DirectedGraph.shortest_path().
+        """
+        i, j = self._id(src), self._id(dst)
+        if i is None or j is None:
+            return INFINITY, []
+
+        if bidirectional:
+            if self._reverse is None:
+                # undirected CSRs store both directions of every edge, so they are their own reverse
+                self._reverse = self.csr.transpose() if self.directed else self.csr
+            distance, path = bidirectional_search(self.csr, self._reverse, i, j, max_distance)
+        else:
+            dist, pred = dijkstra_search(self.csr, i, target=j, max_distance=max_distance)
+            if j not in dist:
+                return INFINITY, []
+            distance, path = dist[j], build_path(pred, j)
+        return distance, list(self._name_of(path))
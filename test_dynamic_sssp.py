@@ -0,0 +1,82 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Regression tests for DynamicShortestPaths under random edge inserts, deletes and reweights
+
+
+import heapq as heap
+import random
+import unittest
+
+from d_graph import DirectedGraph
+from shortest_paths import INFINITY
+
+
+def brute_dijkstra(graph: DirectedGraph, src: int) -> []:
+    """
+    Textbook Dijkstra over graph.get_edges(), independent of the graph's own search code
+    """
+    adjacency = [[] for _ in range(graph.v_count)]
+    for u, v, w in graph.get_edges():
+        adjacency[u].append((v, w))
+    dist = [INFINITY] * graph.v_count
+    dist[src] = 0
+    queue = [(0, src)]
+    while len(queue) != 0:
+        d, u = heap.heappop(queue)
+        if d > dist[u]:
+            continue
+        for v, w in adjacency[u]:
+            if d + w < dist[v]:
+                dist[v] = d + w
+                heap.heappush(queue, (d + w, v))
+    return dist
+
+
+class TestDynamicShortestPaths(unittest.TestCase):
+
+    def check(self, graph: DirectedGraph, tracker, step) -> None:
+        """
+        Compares every tracked tree with a from-scratch search, including the returned paths
+        """
+        for src in tracker.sources:
+            expected = brute_dijkstra(graph, src)
+            self.assertEqual(tracker.dijkstra(src), expected, (step, src))
+            for dst in range(graph.v_count):
+                distance, path = tracker.shortest_path(src, dst)
+                self.assertEqual(distance, expected[dst], (step, src, dst))
+                if distance != INFINITY:
+                    self.assertEqual((path[0], path[-1]), (src, dst))
+                    self.assertEqual(sum(graph.adj_matrix[u][v] for u, v in zip(path, path[1:])), distance)
+
+    def test_random_mutations(self):
+        for seed in range(20):
+            rnd = random.Random(seed)
+            n = rnd.randrange(2, 25)
+            graph = DirectedGraph()
+            for _ in range(n):
+                graph.add_vertex()
+            for _ in range(rnd.randrange(3 * n)):
+                u, v = rnd.randrange(n), rnd.randrange(n)
+                if u != v:
+                    graph.add_edge(u, v, rnd.randint(1, 9))
+            tracker = graph.track_shortest_paths(rnd.sample(range(n), min(n, 3)))
+            self.check(graph, tracker, 'initial')
+
+            for step in range(150):
+                action = rnd.random()
+                u, v = rnd.randrange(graph.v_count), rnd.randrange(graph.v_count)
+                if action < 0.45 and u != v:
+                    graph.add_edge(u, v, rnd.randint(1, 9))  # insert or reweight
+                elif action < 0.9:
+                    graph.remove_edge(u, v)
+                elif action < 0.95:
+                    graph.add_vertex()
+                else:
+                    tracker.add_source(u)
+                self.check(graph, tracker, step)
+            tracker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Regression tests for the parallel BFS (bfs_tree) of both graph classes under random mutations
+
+
+import random
+import unittest
+from collections import deque
+
+from d_graph import DirectedGraph
+from ud_graph import UndirectedGraph
+
+
+def brute_bfs_tree(size: int, edges: [], src: int) -> ([], []):
+    """
+    Plain queue BFS over (u, v) id pairs. Returns (hops, parents) like bfs_tree(): the parent of a vertex is its
+    smallest in-neighbor on the previous level, -1 where unreachable.
+    """
+    adjacency = [[] for _ in range(size)]
+    for u, v in edges:
+        adjacency[u].append(v)
+    hops = [-1] * size
+    hops[src] = 0
+    queue = deque([src])
+    while len(queue) != 0:
+        u = queue.popleft()
+        for v in adjacency[u]:
+            if hops[v] == -1:
+                hops[v] = hops[u] + 1
+                queue.append(v)
+    parents = [-1] * size
+    parents[src] = src
+    for u, v in sorted(edges, reverse=True):  # smallest u is written last
+        if v != src and hops[v] != -1 and hops[u] == hops[v] - 1:
+            parents[v] = u
+    return hops, parents
+
+
+class TestBFSTree(unittest.TestCase):
+
+    def check(self, result, expected, step) -> None:
+        hops, parents = result
+        self.assertEqual((list(hops), list(parents)), expected, step)
+
+    def test_directed_random_mutations(self):
+        for seed in range(10):
+            rnd = random.Random(seed)
+            n = rnd.randrange(2, 40)
+            graph = DirectedGraph()
+            for _ in range(n):
+                graph.add_vertex()
+            for step in range(120):
+                u, v = rnd.randrange(graph.v_count), rnd.randrange(graph.v_count)
+                action = rnd.random()
+                if action < 0.6 and u != v:
+                    graph.add_edge(u, v, rnd.randint(1, 9))
+                elif action < 0.95:
+                    graph.remove_edge(u, v)
+                else:
+                    graph.add_vertex()
+                src = rnd.randrange(graph.v_count)
+                edges = [(u, v) for u, v, _ in graph.get_edges()]
+                self.check(graph.bfs_tree(src, workers=1), brute_bfs_tree(graph.v_count, edges, src), step)
+
+    def test_undirected_random_mutations(self):
+        for seed in range(10):
+            rnd = random.Random(seed)
+            names = [f'v{i}' for i in range(rnd.randrange(2, 40))]
+            graph = UndirectedGraph()
+            for step in range(120):
+                u, v = rnd.sample(names, 2)
+                action = rnd.random()
+                if action < 0.6:
+                    graph.add_edge(u, v)
+                elif action < 0.9:
+                    graph.remove_edge(u, v)
+                elif action < 0.95:
+                    graph.remove_vertex(u)
+                else:
+                    graph.compact()
+                start = rnd.choice(names)
+                result = graph.bfs_tree(start, workers=1)
+                size = len(result[0])  # one slot per id, including the free ids of removed vertices
+                if start not in graph.get_vertices():
+                    self.check(result, ([-1] * size, [-1] * size), step)
+                    continue
+                edges = [(graph.vertex_id(a), graph.vertex_id(b))
+                         for a, neighbors in graph.adj_list.items() for b in neighbors]
+                self.check(result, brute_bfs_tree(size, edges, graph.vertex_id(start)), step)
+
+    def test_workers_agree(self):
+        rnd = random.Random(7)
+        n = 300
+        graph = DirectedGraph()
+        for _ in range(n):
+            graph.add_vertex()
+        for _ in range(6 * n):  # dense enough for the bottom-up levels
+            u, v = rnd.randrange(n), rnd.randrange(n)
+            if u != v:
+                graph.add_edge(u, v)
+        for step in range(3):
+            src = rnd.randrange(n)
+            edges = [(u, v) for u, v, _ in graph.get_edges()]
+            self.check(graph.bfs_tree(src, workers=2), brute_bfs_tree(n, edges, src), step)
+            for _ in range(50):
+                graph.remove_edge(rnd.randrange(n), rnd.randrange(n))
+
+
+if __name__ == '__main__':
+    unittest.main()
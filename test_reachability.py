@@ -0,0 +1,111 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Regression tests for the incrementally maintained ReachabilityIndex under random edge edits
+
+
+import random
+import unittest
+
+from d_graph import DirectedGraph
+from reachability import ReachabilityIndex
+
+
+def brute_closure(graph: DirectedGraph) -> [set]:
+    """
+    The set of vertices each vertex reaches, by one DFS per vertex over graph.get_edges()
+    """
+    adjacency = [[] for _ in range(graph.v_count)]
+    for u, v, _ in graph.get_edges():
+        adjacency[u].append(v)
+    closure = []
+    for src in range(graph.v_count):
+        seen = {src}
+        stack = [src]
+        while len(stack) != 0:
+            for v in adjacency[stack.pop()]:
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        closure.append(seen)
+    return closure
+
+
+class TestReachability(unittest.TestCase):
+
+    def mutate(self, graph: DirectedGraph, rnd: random.Random) -> None:
+        """
+        One random edit: mostly edge inserts and removals (of existing edges, so they take effect), some reweights
+        and new vertices
+        """
+        action = rnd.random()
+        edges = graph.get_edges()
+        if action < 0.45 or len(edges) == 0:
+            u, v = rnd.randrange(graph.v_count), rnd.randrange(graph.v_count)
+            if u != v:
+                graph.add_edge(u, v, rnd.randint(1, 9))
+        elif action < 0.85:
+            u, v, _ = rnd.choice(edges)
+            graph.remove_edge(u, v)
+        elif action < 0.95:
+            u, v, w = rnd.choice(edges)
+            graph.add_edge(u, v, w + 1)
+        else:
+            graph.add_vertex()
+
+    def test_reachable_random_mutations(self):
+        for seed in range(25):
+            rnd = random.Random(seed)
+            n = rnd.randrange(2, 30)
+            graph = DirectedGraph()
+            for _ in range(n):
+                graph.add_vertex()
+            for _ in range(rnd.randrange(2 * n)):
+                u, v = rnd.randrange(n), rnd.randrange(n)
+                if u != v:
+                    graph.add_edge(u, v)
+            for step in range(120):
+                closure = brute_closure(graph)
+                pairs = [(u, v) for u in range(graph.v_count) for v in range(graph.v_count)]
+                expected = [v in closure[u] for u, v in pairs]
+                self.assertEqual([graph.reachable(u, v) for u, v in pairs], expected, (seed, step))
+                self.assertEqual(graph.reachable_many(pairs), expected, (seed, step))
+                self.mutate(graph, rnd)
+
+    def test_small_labels(self):
+        # few label bits and hubs, so most queries fall through to the pruned search
+        for seed in range(10):
+            rnd = random.Random(seed)
+            n = rnd.randrange(10, 40)
+            graph = DirectedGraph()
+            for _ in range(n):
+                graph.add_vertex()
+            for _ in range(n):
+                u, v = sorted(rnd.sample(range(n), 2))
+                graph.add_edge(v, u)  # a DAG, so edits mostly update the index in place
+            index = ReachabilityIndex.build(graph.snapshot().csr, bits=4, hubs=2)
+            graph.add_observer(index)
+            rebuilds = 0
+            for step in range(150):
+                if index.stale:
+                    index.rebuild(graph.snapshot().csr)
+                    rebuilds += 1
+                closure = brute_closure(graph)
+                for u in range(graph.v_count):
+                    for v in range(graph.v_count):
+                        self.assertEqual(index.reachable(u, v), v in closure[u], (seed, step, u, v))
+                self.mutate(graph, rnd)
+            self.assertLess(rebuilds, 150)
+            graph.remove_observer(index)
+
+    def test_invalid_vertices(self):
+        graph = DirectedGraph([(0, 1, 1)])
+        self.assertTrue(graph.reachable(0, 1))
+        self.assertFalse(graph.reachable(1, 0))
+        self.assertFalse(graph.reachable(0, 2))
+        self.assertFalse(graph.reachable(-1, 0))
+        self.assertEqual(graph.reachable_many([(0, 0), (2, 2), (0, -1)]), [True, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
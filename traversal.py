@@ -0,0 +1,208 @@
+# Course: CS261 - Data Structures
+# Author: Jonathon Stoddart
+# Assignment: 6
+# Description: Shared depth-first/breadth-first traversal core for DirectedGraph and UndirectedGraph
+
+
+from array import array
+from collections import deque
+
+
+def iter_dfs(v_start, neighbors, v_end=None, size=None, stats=None):
+    """
+    Lazily yields the vertices visited by a DFS from v_start, stopping after v_end (if given).
+    neighbors(v) must return the direct successors of v as a sequence in ascending order; smaller vertices are
+    explored first. Vertices are integer ids 0..size-1 marked in a bytearray when size is given, or any hashable
+    names marked in a set otherwise. Each vertex is expanded at most once, so a full traversal is O(V + E).
+    stats, if given, is an instrumentation.TraversalStats to count the work in.
+    """
+    if size is not None:
+        yield from _dfs_ids(v_start, neighbors, v_end, size, stats)
+        return
+
+    visited = set()
+    stack = [v_start]  # stack of vertices to visit
+
+    while len(stack) != 0:
+        v = stack.pop()
+        if v in visited:  # pushed more than once before it was reached
+            continue
+        visited.add(v)
+        yield v
+        if v == v_end:  # we have reached the end
+            return
+        successors = neighbors(v)
+        if stats is not None:
+            stats.expand(len(stack), len(successors))
+        for u in reversed(successors):  # descending order (due to stack nature)
+            if u not in visited:
+                stack.append(u)
+
+
+def _dfs_ids(v_start, neighbors, v_end, size, stats):
+    """
+    iter_dfs() for integer ids, with visited flags in a bytearray
+    """
+    visited = bytearray(size)
+    stack = [v_start]
+
+    while len(stack) != 0:
+        v = stack.pop()
+        if visited[v]:
+            continue
+        visited[v] = 1
+        yield v
+        if v == v_end:
+            return
+        successors = neighbors(v)
+        if stats is not None:
+            stats.expand(len(stack), len(successors))
+        for u in reversed(successors):
+            if not visited[u]:
+                stack.append(u)
+
+
+def iter_bfs(v_start, neighbors, v_end=None, size=None, stats=None):
+    """
+    Lazily yields the vertices visited by a BFS from v_start, stopping after v_end (if given).
+    neighbors(v) must return the direct successors of v in ascending order. Vertices are marked (in a bytearray
+    for integer ids 0..size-1, otherwise in a set) when they are enqueued, so each is queued at most once and a full
+    traversal is O(V + E). stats, if given, is an instrumentation.TraversalStats to count the work in.
+    """
+    if size is not None:
+        yield from _bfs_ids(v_start, neighbors, v_end, size, stats)
+        return
+
+    visited = {v_start}
+    queue = deque([v_start])
+
+    while len(queue) != 0:
+        v = queue.popleft()
+        yield v
+        if v == v_end:
+            return
+        successors = neighbors(v)
+        if stats is not None:
+            stats.expand(len(queue), len(successors))
+        for u in successors:  # ascending order (queue)
+            if u not in visited:
+                visited.add(u)
+                queue.append(u)
+
+
+def _bfs_ids(v_start, neighbors, v_end, size, stats):
+    """
+    iter_bfs() for integer ids, with visited flags in a bytearray
+    """
+    visited = bytearray(size)
+    visited[v_start] = 1
+    queue = deque([v_start])
+
+    while len(queue) != 0:
+        v = queue.popleft()
+        yield v
+        if v == v_end:
+            return
+        successors = neighbors(v)
+        if stats is not None:
+            stats.expand(len(queue), len(successors))
+        for u in successors:
+            if not visited[u]:
+                visited[u] = 1
+                queue.append(u)
+
+
+def color_dfs(v_count: int, neighbors, stats=None) -> ([], []):
+    """
+    Iterative three-color (white/grey/black) DFS over integer vertices 0..v_count-1, with no recursion limit.
+    Colors live in a bytearray, so the sweep is O(V + E).
+    Returns (cycle, finished):
+    - cycle is the first cycle found as a vertex list [v0, ..., vk] (edge vk -> v0 closes it), or None
+    - finished lists the vertices in DFS finishing order; reversed, it is a topological order when acyclic
+    stats, if given, is an instrumentation.TraversalStats to count the work in.
+    """
+    white, grey, black = 0, 1, 2
+    color = bytearray(v_count)  # every vertex starts white (unvisited)
+    finished = []
+
+    for root in range(v_count):
+        if color[root] != white:
+            continue
+        color[root] = grey
+        stack = [(root, iter(neighbors(root)))]  # current grey path, with where each vertex left off
+        if stats is not None:
+            stats.expand(1, len(neighbors(root)))
+
+        while len(stack) != 0:
+            v, successors = stack[-1]
+            for u in successors:
+                if color[u] == white:  # descend into u; resume v's successors later
+                    color[u] = grey
+                    stack.append((u, iter(neighbors(u))))
+                    if stats is not None:
+                        stats.expand(len(stack), len(neighbors(u)))
+                    break
+                if color[u] == grey:  # back edge to a vertex on the current path - found a cycle
+                    path = [w for w, _ in stack]
+                    return path[path.index(u):], finished
+            else:  # all successors explored
+                color[v] = black
+                finished.append(v)
+                stack.pop()
+
+    return None, finished
+
+
+def strongly_connected(v_count: int, neighbors, stats=None) -> (array, int):
+    """
+    Iterative Tarjan strongly connected components over integer vertices 0..v_count-1 - O(V + E), no recursion.
+    Returns (comp, count): comp[v] is the component of v, numbered 0..count-1 in reverse topological order, so
+    every edge between two components points from a higher component number to a lower one.
+    stats, if given, is an instrumentation.TraversalStats to count the work in.
+    """
+    index = array('q', [-1]) * v_count  # DFS discovery number of each vertex, -1 while unvisited
+    low = array('q', [0]) * v_count  # smallest discovery number reachable through the DFS subtree
+    comp = array('q', [-1]) * v_count
+    on_stack = bytearray(v_count)
+    members = []  # vertices of the components still being built
+    counter = count = 0
+
+    for root in range(v_count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        members.append(root)
+        on_stack[root] = 1
+        stack = [(root, iter(neighbors(root)))]  # current DFS path, with where each vertex left off
+        if stats is not None:
+            stats.expand(1, len(neighbors(root)))
+
+        while len(stack) != 0:
+            v, successors = stack[-1]
+            for u in successors:
+                if index[u] == -1:  # descend into u; resume v's successors later
+                    index[u] = low[u] = counter
+                    counter += 1
+                    members.append(u)
+                    on_stack[u] = 1
+                    stack.append((u, iter(neighbors(u))))
+                    if stats is not None:
+                        stats.expand(len(stack), len(neighbors(u)))
+                    break
+                if on_stack[u] and index[u] < low[v]:
+                    low[v] = index[u]
+            else:  # all successors explored
+                stack.pop()
+                if len(stack) != 0 and low[v] < low[stack[-1][0]]:
+                    low[stack[-1][0]] = low[v]
+                if low[v] == index[v]:  # v is the root of a component - pop its members
+                    while True:
+                        w = members.pop()
+                        on_stack[w] = 0
+                        comp[w] = count
+                        if w == v:
+                            break
+                    count += 1
+
+    return comp, count
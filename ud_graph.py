@@ -4,6 +4,97 @@
 # Description: Part 1 - Undirected Graph (via Adjacency List)
 
 
+from array import array
+from bisect import bisect_left
+from collections import deque, namedtuple
+from collections.abc import Mapping
+from contextlib import contextmanager
+from threading import RLock
+
+from connectivity import DisjointSets
+from graph_io import edge_rows, load_csr, read_edge_list, save_csr, write_edge_list
+from graph_storage import CSRGraph, pack_paths, typecode
+from instrumentation import traversal_stats
+from parallel import parallel_bfs
+from snapshot import GraphSnapshot
+from traversal import iter_bfs, iter_dfs
+
+
+class NeighborSet(dict):
+    """
+    Insertion-ordered set of neighbor ids, used for each vertex's adjacency
+    - membership, append and remove are O(1) expected (hash lookups) instead of O(degree) list scans
+    - iterates like the list it replaces
+    - keeps a sorted copy for traversals, rebuilt only after the set changes
+    """
+
+    __slots__ = ('_ordered',)
+
+    def __init__(self, neighbors=()):
+        super().__init__(dict.fromkeys(neighbors))
+        self._ordered = None
+
+    def append(self, v) -> None:
+        """
+        Add v as the last neighbor (no effect if already present)
+        """
+        self[v] = None
+        self._ordered = None
+
+    def remove(self, v) -> None:
+        """
+        Remove neighbor v. Raises KeyError if v is not a neighbor
+        """
+        del self[v]
+        self._ordered = None
+
+    def ordered(self, key=None) -> []:
+        """
+        Return the neighbors in ascending order (by key, if given). Callers must always pass the same key.
+        """
+        if self._ordered is None:
+            self._ordered = sorted(self, key=key)
+        return self._ordered
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class AdjacencyView(Mapping):
+    """
+    Read-only {vertex name: [neighbor names]} view of an UndirectedGraph, in the shape of the original adj_list
+    dict. Neighbor lists are materialized on access.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, v: str) -> []:
+        graph = self._graph
+        return [graph._names[j] for j in graph._neighbors(graph._ids[v])]
+
+    def __iter__(self):
+        return iter(self._graph._ids)
+
+    def __len__(self) -> int:
+        return len(self._graph._ids)
+
+    def __contains__(self, v) -> bool:
+        return v in self._graph._ids
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+Components = namedtuple('Components', ['labels', 'count', 'acyclic'])
+Components.__doc__ = """
+Connected components of an UndirectedGraph
+- labels: array of component ids (0..count-1), one per vertex in get_vertices() order
+- count: number of connected components
+- acyclic: True if the graph has no cycle (it is a forest)
+"""
+
+
 class UndirectedGraph:
     """
     Class to implement undirected graph
@@ -11,6 +102,9 @@ class UndirectedGraph:
     - loops not allowed
     - no edge weights
     - vertex names are strings
+    - names are interned to dense integer ids; adjacency is stored by id, in an insertion-ordered NeighborSet per
+      vertex while mutating (O(1) edge insert/delete/lookup), or as 32-bit CSR arrays once compacted
+    - adj_list is a read-only {name: [neighbor names]} view
     """
 
     def __init__(self, start_edges=None):
@@ -40,13 +134,280 @@ class UndirectedGraph:
 
     # ------------------------------------------------------------------ #
 
+    @property
+    def adj_list(self) -> AdjacencyView:
+        """
+        Read-only {vertex: [neighbors]} view of the graph
+        """
+        return AdjacencyView(self)
+
+    @adj_list.setter
+    def adj_list(self, adjacency: {}) -> None:
+        """
+        Replaces the contents of the graph with a {vertex: [neighbors]} mapping
+        """
+        self._ids = dict()  # vertex name -> id, in vertex insertion order
+        self._names = []  # id -> vertex name (None for a free id)
+        self._free = []  # ids of removed vertices, reused by new ones
+        self._rows = []  # id -> NeighborSet of neighbor ids; None while compacted
+        self._csr = None  # compacted adjacency, rows sorted by neighbor name
+        self._id_csr = None  # the same adjacency with rows sorted by neighbor id (see bfs_tree())
+        self._version = 0  # bumped by every mutation
+        self._components = None  # cached connected_components() result, dropped by the next mutation
+        self._edge_count = 0
+        self._tracking = False  # incremental connectivity mode (see track_connectivity())
+        self._sets = None  # union-find kept in sync while tracking; None when it must be rebuilt
+        self._published = None  # (version, GraphSnapshot) last handed out by snapshot()
+        if not hasattr(self, '_write_lock'):  # first assignment, from __init__
+            self._write_lock = RLock()
+            self._batching = 0  # depth of nested batch() blocks
+
+        for v in adjacency:
+            self._intern(v)
+        for v, neighbors in adjacency.items():  # keep each neighbor list in the given order
+            row = self._rows[self._ids[v]]
+            for u in neighbors:
+                if u != v:
+                    row.append(self._intern(u))
+        for i, row in enumerate(self._rows):  # add any missing back-references so edges are symmetric
+            for j in row:
+                if i not in self._rows[j]:
+                    self._rows[j].append(i)
+        self._edge_count = sum(len(row) for row in self._rows) // 2
+
+    def _changed(self) -> None:
+        """
+        Records a mutation and drops results cached for the previous version of the graph
+        """
+        self._version += 1
+        self._components = None
+        self._csr = None
+        self._id_csr = None
+
+    def _removed(self) -> None:
+        """
+        Records a removal. Union-find cannot split sets, so the incremental structure is rebuilt on the next query.
+        """
+        self._changed()
+        self._sets = None
+
+    def _thaw(self) -> []:
+        """
+        Returns the mutable rows, rebuilding them from the CSR arrays if the graph was compacted
+        """
+        if self._rows is None:
+            self._rows = [NeighborSet(self._csr.neighbors(i)) for i in range(self._csr.v_count)]
+        return self._rows
+
+    def _intern(self, v: str) -> int:
+        """
+        Returns the id of vertex v, creating the vertex (and reusing a free id) if it does not exist yet
+        """
+        i = self._ids.get(v)
+        if i is None:
+            rows = self._thaw()
+            if len(self._free) > 0:
+                i = self._free.pop()
+                self._names[i] = v
+                rows[i] = NeighborSet()
+            else:
+                i = len(self._names)
+                self._names.append(v)
+                rows.append(NeighborSet())
+            self._ids[v] = i
+            self._changed()
+            if self._sets is not None:
+                self._sets.add(i)
+        return i
+
+    def _link(self, i: int, j: int) -> None:
+        """
+        Adds the edge between ids i and j if it does not exist yet
+        """
+        rows = self._thaw()
+        if j not in rows[i]:  # check if edge exists - O(1) hash lookup
+            rows[i].append(j)
+            rows[j].append(i)
+            self._edge_count += 1
+            self._changed()
+            if self._sets is not None:
+                self._sets.union(i, j)
+
+    def _neighbors(self, i: int):
+        """
+        Returns the neighbor ids of vertex i in insertion order (name order once compacted)
+        """
+        if self._rows is None:
+            return self._csr.neighbors(i)
+        return self._rows[i]
+
+    def _ordered_neighbors(self, i: int):
+        """
+        Return the neighbor ids of vertex i sorted by name (cached per vertex until its neighbors change)
+        """
+        if self._rows is None:
+            return self._csr.neighbors(i)  # CSR rows are stored in name order
+        return self._rows[i].ordered(key=self._names.__getitem__)
+
+    def _has_edge(self, i: int, j: int) -> bool:
+        """
+        Returns True if ids i and j are adjacent. O(1) while mutable, binary search by name once compacted.
+        """
+        if self._rows is not None:
+            return j in self._rows[i]
+        lo, hi = self._csr.offsets[i], self._csr.offsets[i + 1]
+        k = bisect_left(self._csr.targets, self._names[j], lo, hi, key=self._names.__getitem__)
+        return k < hi and self._csr.targets[k] == j
+
+    def csr(self) -> CSRGraph:
+        """
+        Returns the adjacency as an unweighted CSRGraph over vertex ids (each edge stored in both directions,
+        rows sorted by neighbor name). Built once and cached until the next mutation. O(V + E).
+        """
+        if self._csr is None:
+            self._csr = CSRGraph.from_neighbor_lists(self._ordered_neighbors(i) for i in range(len(self._names)))
+        return self._csr
+
+    def compact(self) -> None:
+        """
+        Compacts the adjacency into 32-bit CSR arrays (4 bytes per neighbor entry) and frees the per-vertex hash
+        sets. Queries keep working on the arrays; the next mutation rebuilds the sets. Neighbor lists of a
+        compacted graph come back in name order rather than insertion order.
+        """
+        self.csr()
+        self._rows = None
+
+    def _publish(self) -> GraphSnapshot:
+        """
+        Compacts the current version into a GraphSnapshot and makes it the one snapshot() returns
+        """
+        snap = GraphSnapshot(self.csr(), self._version, directed=False,
+                             names=tuple(self._names), ids=dict(self._ids))
+        self._published = (self._version, snap)  # swapped in with a single assignment
+        return snap
+
+    def snapshot(self) -> GraphSnapshot:
+        """
+        Returns an immutable read view of the latest published version of the graph, which reader threads can query
+        without locks while a writer mutates the graph inside batch() (see DirectedGraph.snapshot()).
+        Mutations from other threads must go through batch().
+        """
+        published = self._published
+        if published is not None and published[0] == self._version:
+            return published[1]
+        if not self._write_lock.acquire(blocking=published is None):
+            return published[1]  # a batch is being applied - keep serving the last published version
+        try:
+            if self._batching:  # called by the writer mid-batch
+                return published[1] if published is not None else self._publish()
+            return self._publish()
+        finally:
+            self._write_lock.release()
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager for a writer thread applying a group of mutations. Holds the writer lock for the block and
+        publishes the new version when the outermost batch exits (see DirectedGraph.batch()).
+        """
+        with self._write_lock:
+            if self._published is None:
+                self._publish()
+            self._batching += 1
+            try:
+                yield self
+            finally:
+                self._batching -= 1
+            if not self._batching:
+                self._publish()
+
+    @classmethod
+    def read_edge_list(cls, path, delimiter=None, columns=(0, 1), **options) -> 'UndirectedGraph':
+        """
+        Builds a graph from a delimited edge-list text file (plain, gzip, bz2, xz or zstd), streaming it in
+        bounded-size chunks. See graph_io.read_edge_list() for the options.
+        """
+        graph = cls()
+        for chunk in read_edge_list(path, delimiter, columns, **options):
+            graph.add_edges_from(chunk)
+        return graph
+
+    def write_edge_list(self, path, delimiter='\t', **options) -> int:
+        """
+        Streams the edges to a delimited (optionally compressed) text file, one u, v pair per line.
+        Returns the number of edges written.
+        """
+        return write_edge_list(path, self.iter_edges(), delimiter, **options)
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to path in the versioned binary CSR format (see graph_io), with ids renumbered densely in
+        get_vertices() order and the vertex names in the name table
+        """
+        order = list(self._ids.values())
+        new_id = array('i', [-1]) * len(self._names)
+        for k, i in enumerate(order):
+            new_id[i] = k
+        csr = CSRGraph.from_neighbor_lists([new_id[j] for j in self._ordered_neighbors(i)] for i in order)
+        save_csr(path, csr, directed=False, names=self._ids)
+
+    @classmethod
+    def load(cls, path, mmap=True) -> 'UndirectedGraph':
+        """
+        Loads a graph written by save(). With mmap=True the adjacency arrays are memory-mapped rather than read, and
+        read-only queries (dfs, bfs, is_valid_path, ...) run straight off the mapping; only the name table is decoded
+        up front. The graph comes back compacted (see compact()).
+        """
+        csr, directed, names = load_csr(path, mmap)
+        if directed or names is None:
+            raise ValueError(f'{path} does not hold an undirected graph')
+        graph = cls()
+        graph._names = names
+        graph._ids = {name: i for i, name in enumerate(names)}
+        graph._rows = None
+        graph._csr = csr
+        graph._edge_count = len(csr.targets) // 2
+        return graph
+
+    def vertex_id(self, v: str) -> int:
+        """
+        Returns the dense integer id of vertex v (KeyError if v is not in the graph). Ids of removed vertices are
+        reused, so ids are only stable while the vertex exists.
+        """
+        return self._ids[v]
+
+    def vertex_name(self, i: int) -> str:
+        """
+        Returns the name of the vertex with id i
+        """
+        return self._names[i]
+
+    @classmethod
+    def from_edges(cls, edges=None, *, src=None, dst=None) -> 'UndirectedGraph':
+        """
+        Builds a graph from (u, v) pairs or from src/dst columns in a single O(V + E) pass.
+        The result is the same as passing the edges to the constructor.
+        """
+        graph = cls()
+        graph.add_edges_from(edges, src=src, dst=dst)
+        return graph
+
+    def add_edges_from(self, edges=None, *, src=None, dst=None) -> None:
+        """
+        Adds many edges at once, with the same result as calling add_edge() for each pair in order.
+        Input is either an iterable of (u, v) pairs (a list of tuples or 2-char strings, a 2-D NumPy array, ...)
+        or equal-length src/dst columns. Duplicates and self-loops are dropped in the same pass.
+        """
+        for u, v, _ in edge_rows(edges, src, dst):
+            if u != v:
+                self._link(self._intern(u), self._intern(v))
+
     def add_vertex(self, v: str) -> None:
         """
         Add new vertex to the graph. If a vertex with the same name is already present, does nothing.
         """
-        if v not in self.adj_list:
-            self.adj_list[v] = []  # create vertex in graph
-        
+        self._intern(v)
+
     def add_edge(self, u: str, v: str) -> None:
         """
         Add edge to the graph, connecting the two vertices u and v. If either vertex does not exist,
@@ -54,60 +415,126 @@ class UndirectedGraph:
         are the same vertex, does nothing.
         """
         if u != v:
-            if u not in self.adj_list:  # check if vertex u exists
-                self.add_vertex(u)
-            if v not in self.adj_list:  # check if vertex v exists
-                self.add_vertex(v)
-            if u not in self.adj_list[v]:  # check if edge exists
-                self.adj_list[u].append(v)
-                self.adj_list[v].append(u)
+            i = self._intern(u)  # creates vertex u if needed
+            j = self._intern(v)  # creates vertex v if needed
+            self._link(i, j)
 
     def remove_edge(self, v: str, u: str) -> None:
         """
         Remove edge from the graph, disconnecting vertices v and u. If either vertex does not exist or there
         is no edge between them, does nothing.
         """
-        if v in self.adj_list:  # check that vertex v exists
-            if u in self.adj_list[v]:  # check that edge to/from u exists
-                self.adj_list[v].remove(u)
-                self.adj_list[u].remove(v)
-        
+        i, j = self._ids.get(v), self._ids.get(u)
+        if i is not None and j is not None and self._has_edge(i, j):  # check that both vertices and the edge exist
+            rows = self._thaw()
+            rows[i].remove(j)
+            rows[j].remove(i)
+            self._edge_count -= 1
+            self._removed()
+
+    def _release(self, i: int) -> NeighborSet:
+        """
+        Removes vertex id i from the name table and returns its neighbor set. The id becomes free for reuse.
+        """
+        rows = self._thaw()
+        neighbors = rows[i]
+        del self._ids[self._names[i]]
+        self._names[i] = None
+        rows[i] = NeighborSet()
+        self._free.append(i)
+        return neighbors
+
     def remove_vertex(self, v: str) -> None:
         """
-        Remove vertex and all connected edges
+        Remove vertex and all connected edges. Only the neighbors of v are touched - O(deg(v))
         """
-        # if vertex exists, delete it (and its listed edges)
-        if v in self.adj_list:
-            del self.adj_list[v]
+        i = self._ids.get(v)
 
-        # remove all incidences of v stored as a neighbor of another vertex
-        for vertex, neighbors in self.adj_list.items():
-            if v in neighbors:
-                neighbors.remove(v)
+        # if vertex exists, delete it (and its listed edges)
+        if i is not None:
+            neighbors = self._release(i)
+            for j in neighbors:  # v is only listed by its own neighbors (edges are symmetric)
+                self._rows[j].remove(i)
+            self._edge_count -= len(neighbors)
+            self._removed()
+
+    def remove_vertices(self, vertices) -> None:
+        """
+        Remove every vertex in the iterable along with all connected edges (vertices not in the graph are ignored).
+        Costs O(total degree of the removed vertices); edges between two removed vertices are dropped wholesale.
+        """
+        removed = {}  # removed vertex id -> its neighbor ids
+
+        for v in vertices:
+            i = self._ids.get(v)
+            if i is not None:
+                removed[i] = self._release(i)
+
+        internal = 0  # edges with both ends removed, seen once from each side
+        for i, neighbors in removed.items():
+            for j in neighbors:
+                if j not in removed:  # surviving neighbor - drop its back-reference
+                    self._rows[j].remove(i)
+                    self._edge_count -= 1
+                else:
+                    internal += 1
+
+        self._edge_count -= internal // 2
+        if len(removed) > 0:
+            self._removed()
 
     def get_vertices(self) -> []:
         """
         Return list of vertices in the graph (any order)
         """
-        vertices = []
+        return list(self._ids)
 
-        for vertex in self.adj_list.keys():  # fill vertices list
-            vertices.append(vertex)
+    def _iter_edge_ids(self, order=None):
+        """
+        Yields each edge once as a pair of vertex ids (see iter_edges() for the orders)
+        """
+        if order is None:
+            done = bytearray(len(self._names))  # vertices whose edges were all yielded already
+            for i in self._ids.values():
+                for j in self._neighbors(i):
+                    if not done[j]:  # (j, i) has not been yielded from the other end
+                        yield i, j
+                done[i] = 1
+        elif order == 'sorted':
+            names = self._names
+            for u in sorted(self._ids):  # neighbor lists are already cached in name order
+                i = self._ids[u]
+                for j in self._ordered_neighbors(i):
+                    if u < names[j]:
+                        yield i, j
+        else:
+            raise ValueError(f'unknown edge order {order!r}')
+
+    def iter_edges(self, order=None):
+        """
+        Lazily yields each edge once as a (u, v) tuple, without building a list. O(V + E).
+        By default edges come in get_edges() order. order='sorted' gives the canonical form instead: every edge as
+        (u, v) with u < v, sorted by u then v (adds an O(V log V) sort of the vertex names).
+        """
+        names = self._names
+        return ((names[i], names[j]) for i, j in self._iter_edge_ids(order))
 
-        return vertices
+    def edge_arrays(self, order=None) -> (array, array):
+        """
+        Returns the edges as columnar (src, dst) arrays of vertex ids (see vertex_name()), in iter_edges() order.
+        No tuple is kept per edge, and numpy.frombuffer can wrap the arrays without copying.
+        """
+        src, dst = array('i'), array('i')
+        for i, j in self._iter_edge_ids(order):
+            src.append(i)
+            dst.append(j)
+        return src, dst
 
     def get_edges(self) -> []:
         """
         Return list of edges in the graph (any order)
         """
-        edges = []
-
-        for vertex, neighbors in self.adj_list.items():
-            for neighbor in neighbors:
-                if (neighbor, vertex) not in edges:  # avoid duplicates i.e. (A, B) and (B, A)
-                    edges.append((vertex, neighbor))
-        
-        return edges
+        return list(self.iter_edges())  # each edge is yielded once, from whichever end comes first - O(V + E)
 
     def is_valid_path(self, path: []) -> bool:
         """
@@ -116,120 +543,184 @@ class UndirectedGraph:
         if len(path) == 0:  # an empty path is considered valid
             return True
 
-        if path[0] not in self.adj_list:  # check if starting vertex exists
+        i = self._ids.get(path[0])
+        if i is None:  # check if starting vertex exists
             return False
 
-        for v in range(len(path)-1):  # check if each edge in path exists
-            if path[v+1] not in self.adj_list[path[v]]:
+        for v in range(1, len(path)):  # check if each edge in path exists
+            j = self._ids.get(path[v])
+            if j is None or not self._has_edge(i, j):
                 return False
+            i = j
 
         return True
 
-    def dfs(self, v_start, v_end=None) -> []:
+    def validate_paths(self, paths, offsets=None, weights=False):
         """
-        Return list of vertices visited during DFS search
-        Vertices are picked in alphabetical order
+        Batch version of is_valid_path(). paths is either a ragged iterable of paths, or (with offsets) the flat
+        vertex names of all paths where path p is paths[offsets[p]:offsets[p+1]].
+        Returns a bytearray with 1 for each valid path and 0 otherwise. With weights=True returns (valid, totals),
+        where totals holds the length (edge count) of each valid path.
+        Names are interned once per hop and edges are looked up in the hashed neighbor sets (or by binary search
+        once the graph is compacted).
         """
-        if v_start not in self.adj_list:  # start vertex not in graph
-            return []
+        if offsets is None:
+            paths, offsets = pack_paths(paths)
+        ids, has_edge = self._ids, self._has_edge
+        count = len(offsets) - 1
+        valid = bytearray(count)
+        totals = array('q', [0]) * count if weights else None
+
+        for p in range(count):
+            lo, hi = offsets[p], offsets[p + 1]
+            if lo == hi:  # an empty path is considered valid
+                valid[p] = 1
+                continue
+            i = ids.get(paths[lo])
+            if i is None:  # check if starting vertex exists
+                continue
+            for k in range(lo + 1, hi):
+                j = ids.get(paths[k])
+                if j is None or not has_edge(i, j):
+                    break
+                i = j
+            else:
+                valid[p] = 1
+                if weights:
+                    totals[p] = hi - lo - 1
+
+        return (valid, totals) if weights else valid
+
+    def iter_dfs(self, v_start, v_end=None):
+        """
+        Lazily yields the vertices visited during DFS search (see dfs()), so callers can stop early
+        """
+        if v_start not in self._ids:  # start vertex not in graph
+            return iter(())
+        stats = traversal_stats('UndirectedGraph.dfs')
+        ids = iter_dfs(self._ids[v_start], self._ordered_neighbors, self._ids.get(v_end), len(self._names), stats)
+        return map(self._names.__getitem__, ids)
 
-        visited = []  # stack of visited vertices
-        stack = []  # stack of neighbors to visit
-        stack.append(v_start)
+    def iter_bfs(self, v_start, v_end=None):
+        """
+        Lazily yields the vertices visited during BFS search (see bfs()), so callers can stop early
+        """
+        if v_start not in self._ids:
+            return iter(())
+        stats = traversal_stats('UndirectedGraph.bfs')
+        ids = iter_bfs(self._ids[v_start], self._ordered_neighbors, self._ids.get(v_end), len(self._names), stats)
+        return map(self._names.__getitem__, ids)
 
-        while len(stack) != 0:
-            v = stack.pop()
-            if v == v_end:  # we have reached the end. add to visited and return
-                visited.append(v)
-                return visited
-            elif v not in visited:  # avoid duplicates
-                visited.append(v)
-                for neighbor in sorted(self.adj_list[v], key=None, reverse=True):  # direct successors in descending alphabetical order (stack)
-                    stack.append(neighbor)
+    def bfs_tree(self, v_start, workers=None) -> (array, array):
+        """
+        Parallel, direction-optimizing BFS from v_start for very large graphs (see parallel.parallel_bfs()).
+        Returns compact (hops, parents) arrays indexed by vertex id (see vertex_id()/vertex_name()): hop counts and
+        BFS tree parent ids, -1 where unreachable. Ties go to the parent with the smallest id, so the result does not
+        depend on the number of workers.
+        """
+        size = len(self._names)
+        if v_start not in self._ids:  # start vertex not in graph
+            return array('q', [-1]) * size, array('q', [-1]) * size
+        if self._id_csr is None:  # csr() rows are in name order; the parallel BFS needs them in id order
+            csr = self.csr()
+            self._id_csr = CSRGraph.from_neighbor_lists((sorted(csr.neighbors(i)) for i in range(size)),
+                                                        typecode(csr.targets))
+        return parallel_bfs(self._id_csr, self._ids[v_start], workers, self._id_csr)
 
-        return visited
+    def dfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during DFS search
+        Vertices are picked in alphabetical order
+        """
+        return list(self.iter_dfs(v_start, v_end))
 
     def bfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during BFS search
         Vertices are picked in alphabetical order
         """
-        if v_start not in self.adj_list:
-            return []
-        
-        visited = []
-        queue = []
-        queue.append(v_start)
-
-        while len(queue) != 0:
-            v = queue.pop(0)  # pop first element since list is a queue and not a stack
-            if v == v_end:
-                visited.append(v)
-                return visited
-            elif v not in visited:
-                visited.append(v)
-                for neighbor in sorted(self.adj_list[v]):  # direct successors in ascending alphabetical order (queue)
-                    if neighbor not in visited:
-                        queue.append(neighbor)
-
-        return visited        
+        return list(self.iter_bfs(v_start, v_end))
 
-    def count_connected_components(self):
+    def connected_components(self) -> Components:
         """
-        Return number of connected componets in the graph
+        Labels every vertex with its connected component in a single O(V + E) BFS sweep, and returns the labels,
+        the component count and whether the graph is acyclic together. The result is cached until the graph changes.
         """
-        if len(self.adj_list) == 0:  # empty graph - no conencted components
-            return 0
-
-        components = []  # list of components
-        visited = []  # vertices visited by dfs search
+        if self._components is not None:
+            return self._components
 
-        # run a dfs search for each unvisited vertex in the graph
-        for v in self.adj_list:
-            if v not in visited:  # skip vertices we already visited in a previous dfs search
-                component = self.dfs(v)
-                components.append(component)
-                for u in component:  # mark each vertex in the component as visited
-                    visited.append(u)
+        by_id = array('i', [-1]) * len(self._names)  # component of each vertex id
+        count = 0
 
-        return len(components)
+        for i in self._ids.values():  # sweep in vertex order so labels are numbered in that order
+            if by_id[i] != -1:  # already labeled by an earlier sweep
+                continue
+            by_id[i] = count
+            queue = deque([i])
+            while len(queue) != 0:
+                for j in self._neighbors(queue.popleft()):
+                    if by_id[j] == -1:
+                        by_id[j] = count
+                        queue.append(j)
+            count += 1
+
+        labels = array('i', [by_id[i] for i in self._ids.values()])
+        # a graph is a forest exactly when every component is a tree, i.e. E = V - (number of components)
+        acyclic = self._edge_count == len(self._ids) - count
+        self._components = Components(labels, count, acyclic)
+        return self._components
+
+    def track_connectivity(self, enabled=True) -> None:
+        """
+        Turns incremental connectivity tracking on or off. While on, add_vertex() and add_edge() keep a union-find
+        structure up to date, so count_connected_components(), connected() and has_cycle() are near O(1).
+        Removals cannot be applied to union-find; they mark it stale and the next query rebuilds it in O(V + E).
+        """
+        self._tracking = enabled
+        self._sets = None
 
-    def has_cycle(self):
+    def _disjoint_sets(self) -> DisjointSets:
         """
-        Return True if graph contains a cycle, False otherwise
+        Returns the incremental union-find over vertex ids, rebuilding it if a removal invalidated it
+        """
+        if self._sets is None:
+            sets = DisjointSets()
+            for i in self._ids.values():
+                sets.add(i)
+                for j in self._neighbors(i):
+                    if j in sets:  # each edge is united once, from whichever end is seen second
+                        sets.union(i, j)
+            self._sets = sets
+        return self._sets
+
+    def connected(self, u: str, v: str) -> bool:
+        """
+        Return True if u and v are both in the graph and joined by a path
         """
-        if 0 <= len(self.adj_list) <= 1 :  # 0 or 1 vertices - no cycle
+        if u not in self._ids or v not in self._ids:
             return False
+        if self._tracking:
+            return self._disjoint_sets().connected(self._ids[u], self._ids[v])
+        for w in self.iter_bfs(u, v):  # stops as soon as v is reached
+            if w == v:
+                return True
+        return False
 
-        # first find components that will later undergo BFS search
-        components = []
-        visited = []
-
-        # run a dfs search for each unvisited vertex in the graph
-        for v in self.adj_list:
-            if v not in visited:  # skip vertices we already visited in a previous dfs search
-                component = self.dfs(v)
-                components.append(component)
-                for u in component:  # mark each vertex in the component as visited
-                    visited.append(u)
-
-        # conduct BFS search on each component to determine whether graph is cyclic or acyclic
-        for component in components:
-            visited = []
-            queue = []
-            queue.append(component[0])
-
-            while len(queue) != 0:
-                v = queue.pop(0)
-                if v not in visited:
-                    visited.append(v)
-                    for neighbor in sorted(self.adj_list[v]):
-                        if neighbor in queue and neighbor not in visited:
-                            # if current vertex and a visited vertex share a neighbor, we have a cycle
-                            return True
-                        queue.append(neighbor)
+    def count_connected_components(self):
+        """
+        Return number of connected componets in the graph
+        """
+        if self._tracking:
+            return self._disjoint_sets().count
+        return self.connected_components().count
 
-        return False
+    def has_cycle(self):
+        """
+        Return True if graph contains a cycle, False otherwise
+        """
+        if self._tracking:  # a forest has exactly V - (number of components) edges
+            return self._edge_count > len(self._ids) - self._disjoint_sets().count
+        return not self.connected_components().acyclic
 
 
 if __name__ == '__main__':